@@ -0,0 +1,56 @@
+import sys
+import json
+import argparse
+
+from typing import Dict, Tuple
+
+
+# compares two result files of benchmarks.run, exits with 1 if anything got slower than the threshold
+#   uv run python -m benchmarks.compare baseline.json candidate.json [--threshold 0.1]
+DEFAULT_THRESHOLD = 0.1
+# differences below this many seconds are timer noise for the micro benchmarks
+DEFAULT_MIN_DELTA = 0.002
+
+
+def load_results(path: str) -> Dict[Tuple[str, int], dict]:
+    with open(path, "r", encoding="utf8") as f:
+        data = json.load(f)
+    return {(result["name"], result["scale"]): result for result in data["results"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compares two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD,
+        help="relative slowdown of the best time counted as regression",
+    )
+    parser.add_argument(
+        "--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+        help="absolute slowdown in seconds below which no regression is reported",
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    regressions = 0
+    print(f"{'benchmark':<26} {'scale':>5} {'baseline ms':>12} {'candidate ms':>12} {'change':>8} {'peak MiB':>9}")
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda k: (k[1], k[0])):
+        before, after = baseline[key]["best_s"], candidate[key]["best_s"]
+        change = after / before - 1 if before > 0 else 0.0
+        marker = ""
+        if change > args.threshold and after - before > args.min_delta:
+            regressions += 1
+            marker = "  REGRESSION"
+        print(
+            f"{key[0]:<26} {key[1]:>5} {before * 1000:>12.2f} {after * 1000:>12.2f} {change:>+8.1%} "
+            f"{candidate[key]['peak_alloc_bytes'] / 1024 / 1024:>9.2f}{marker}"
+        )
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]:<26} {key[1]:>5} only in {'baseline' if key in baseline else 'candidate'}")
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import os
+import html
+import json
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import yaml
+
+
+# fixtures in the formats of the remote sources, derived from the published data
+# scale > 1 repeats every series under a new name, e.g. "CCS" -> "CCS 2"
+PUBLISHED_PATH = "../docs/data/conferences.json"
+ALLCONF_NAME = "allconf.yml"
+ALLACC_NAME = "allacc.yml"
+GUOFEIGU_NAME = "sec_conf_stat.htm"
+# yaml.safe_dump escapes control characters, they are put in after dumping
+_INVALID_PLACEHOLDER = "INVALIDCHARACTER"
+
+CATEGORY_CODES = {
+    "Computer Engineering": "DS",
+    "Networking and Distributed Systems": "NW",
+    "Security and Privacy": "SC",
+    "Software Engineering": "SE",
+    "Databases": "DB",
+    "Theoretical Computer Science": "CT",
+    "Computer Graphics": "CG",
+    "Artificial Intelligence": "AI",
+    "Computer Human Interaction": "HI",
+    "Other": "MX",
+}
+
+
+def load_published(path: str = PUBLISHED_PATH) -> List[dict]:
+    with open(path, "r", encoding="utf8") as f:
+        return list(json.load(f).values())
+
+
+def _scaled(series: List[dict], scale: int) -> List[dict]:
+    result = []
+    for i in range(scale):
+        for entry in series:
+            name = entry["name"] if i == 0 else f"{entry['name']} {i + 1}"
+            result.append({**entry, "name": name})
+    return result
+
+
+def _deadline(date: str) -> Dict[str, str]:
+    # "2025-01-09 23:59:59-12:00" -> deadline in local time plus ccfddl timezone
+    parsed = datetime.fromisoformat(date)
+    deadline = parsed.strftime("%Y-%m-%d %H:%M:%S")
+    offset = parsed.utcoffset()
+    if offset is None:
+        return {"deadline": deadline, "timezone": "UTC"}
+    hours = int(offset.total_seconds() // 3600)
+    if hours == -12:
+        return {"deadline": deadline, "timezone": "AoE"}
+    return {"deadline": deadline, "timezone": f"UTC{hours:+d}"}
+
+
+def _conference_dates(timeline: List[dict]) -> Optional[str]:
+    start = next((e["date"] for e in timeline if e["description"] == "Conference start" and e["date"]), None)
+    end = next((e["date"] for e in timeline if e["description"] == "Conference end" and e["date"]), None)
+    if start is None:
+        return None
+    start = datetime.fromisoformat(start)
+    if end is None:
+        return f"{start:%B} {start.day}, {start.year}"
+    end = datetime.fromisoformat(end)
+    if (start.year, start.month) == (end.year, end.month):
+        return f"{start:%B} {start.day}-{end.day}, {start.year}"
+    return f"{start:%B} {start.day}, {start.year} - {end:%B} {end.day}, {end.year}"
+
+
+def build_allconf(series: List[dict]) -> str:
+    entries = []
+    for i, entry in enumerate(series):
+        confs = []
+        for year, conference in entry["conferences"].items():
+            timeline = []
+            timezone = "AoE"
+            for event in conference["timeline"]:
+                if event["description"] in ("Conference start", "Conference end") or event["date"] is None:
+                    continue
+                deadline = _deadline(event["date"])
+                timezone = deadline.pop("timezone")
+                if event["description"]:
+                    deadline["comment"] = event["description"]
+                timeline.append(deadline)
+            conf = {
+                "year": int(year),
+                "link": conference["link"],
+                "place": conference["location"],
+                "timezone": timezone,
+                "timeline": timeline or [{"deadline": "TBD"}],
+            }
+            dates = _conference_dates(conference["timeline"])
+            if dates is not None:
+                conf["date"] = dates
+            confs.append(conf)
+        description = entry["description"]
+        if i % 50 == 0:
+            # the real data contains a few characters yaml does not accept
+            description += _INVALID_PLACEHOLDER
+        entries.append({
+            "title": entry["name"],
+            "description": description,
+            "sub": CATEGORY_CODES[entry["category"]],
+            "rank": entry["rankings"],
+            "confs": confs,
+        })
+    return yaml.safe_dump(entries, allow_unicode=True, sort_keys=False).replace(_INVALID_PLACEHOLDER, "\x07")
+
+
+def build_allacc(series: List[dict]) -> str:
+    entries = []
+    for entry in series:
+        if len(entry["acceptance_statistics"]) == 0:
+            continue
+        entries.append({
+            "title": entry["name"],
+            "accept_rates": [
+                {
+                    "year": int(year),
+                    "submitted": stats["submitted"],
+                    "accepted": stats["accepted"],
+                    "str": f"{stats['accepted'] / stats['submitted']:.1%}({stats['accepted']}/{stats['submitted']})",
+                }
+                for year, stats in entry["acceptance_statistics"].items()
+            ],
+        })
+    return yaml.safe_dump(entries, allow_unicode=True, sort_keys=False)
+
+
+def build_guofeigu(series: List[dict]) -> str:
+    # second table of the page: a title row, a row of linked conference names and one row per year
+    columns = [
+        entry for entry in series
+        if entry["category"] == "Security and Privacy" and len(entry["acceptance_statistics"]) > 0
+    ]
+    years = sorted({int(year) for entry in columns for year in entry["acceptance_statistics"]}, reverse=True)
+    rows = ['<tr><td colspan="%d">Acceptance ratio of top security conferences</td></tr>' % (len(columns) + 1)]
+    rows.append("<tr>" + "".join(
+        f'<td><b><a href="https://example.org/{i}">{html.escape(entry["name"])}</a></b></td>'
+        for i, entry in enumerate(columns)
+    ) + "</tr>")
+    for year in years:
+        cells = [f"<td>{year}</td>"]
+        for entry in columns:
+            stats = entry["acceptance_statistics"].get(str(year))
+            if stats is None:
+                cells.append("<td>-</td>")
+                continue
+            rate = stats["accepted"] / stats["submitted"] * 100
+            cells.append(f"<td>{rate:.1f}% ({stats['accepted']}/{stats['submitted']})</td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    return (
+        "<html><head><title>Security conference statistics</title></head><body>\n"
+        "<table><tbody><tr><td>Computer Security Conference Ranking and Statistic</td></tr></tbody></table>\n"
+        "<table border=\"1\"><tbody>\n" + "\n".join(rows) + "\n</tbody></table>\n"
+        "<table><tbody><tr><td>Last updated</td></tr></tbody></table>\n"
+        "</body></html>\n"
+    )
+
+
+def write_fixtures(directory: str, scale: int = 1, published_path: str = PUBLISHED_PATH) -> Dict[str, str]:
+    # returns file name -> path
+    series = _scaled(load_published(published_path), scale)
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, content in (
+        (ALLCONF_NAME, build_allconf(series)),
+        (ALLACC_NAME, build_allacc(series)),
+        (GUOFEIGU_NAME, build_guofeigu(series)),
+    ):
+        path = os.path.join(directory, name)
+        with open(path, "w", encoding="utf8") as f:
+            f.write(content)
+        paths[name] = path
+    return paths
@@ -0,0 +1,327 @@
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src import dates, model
+from src.cache import HttpCache
+from src.fetch import Fetcher
+from src.model import ConferenceStore, Category
+from src.pipeline import PipelineOptions, run
+from src.sources import load_sources
+from src.sources.ccfddl import CCFDDL, CCFDDL_BASE_URL, CCFDDL_ACCEPTANCE_URL, strip_invalid_yaml, load_yaml
+from src.sources.guofeigu import URL as GUOFEIGU_URL, iter_statistics
+
+from .fixtures import write_fixtures, ALLCONF_NAME, ALLACC_NAME, GUOFEIGU_NAME, PUBLISHED_PATH
+
+
+# benchmarks of the data loading pipeline, running entirely from local fixtures
+# run from the data-loading directory with
+#   uv run python -m benchmarks.run [--scales 1 10 100] [--output results.json]
+# scale 100 takes several minutes per benchmark and is not run by default
+DEFAULT_SCALES = [1, 10]
+DEFAULT_OUTPUT_DIR = "benchmarks/results"
+RESULTS_VERSION = 1
+
+
+@dataclass
+class Context:
+    scale: int
+    directory: str
+    fixtures: Dict[str, str]
+    allconf: bytes
+    allacc: bytes
+    guofeigu: bytes
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # setup(context) -> state, not timed
+    setup: Callable[[Context], Any]
+    # run(state), timed
+    run: Callable[[Any], Any]
+
+
+def reset_caches():
+    # memoized helpers would otherwise make every repetition after the first a cache hit
+    for function in (dates.parse_datetime, dates.parse_date_range, model.normalize_series_name, model.series_key):
+        function.cache_clear()
+
+
+def _mapped_series(context: Context):
+    source = CCFDDL()
+    store = ConferenceStore()
+    return [source._map_to_series(entry, store) for entry in load_yaml(context.allconf, "utf8")]
+
+
+def _setup_store(context: Context) -> ConferenceStore:
+    store = ConferenceStore()
+    for series in _mapped_series(context):
+        store.add_or_merge_series(series)
+    return store
+
+
+def _add_or_merge(state):
+    store = ConferenceStore()
+    first, second = state
+    for series in first:
+        store.add_or_merge_series(series)
+    # second pass exercises the merge path
+    for series in second:
+        store.add_or_merge_series(series)
+
+
+def _find_series(state):
+    store, names = state
+    for name in names:
+        store.find_series(name=name)
+    for category in Category:
+        store.find_series(category=category)
+
+
+def _setup_resolve_series(context: Context):
+    store = _setup_store(context)
+    store.build_name_index()
+    names = [entry["title"] for entry in load_yaml(context.allacc, "utf8")]
+    names += [name for name, _, _ in iter_statistics(context.guofeigu.decode("utf8"))]
+    # misspelled names go through the trigram index
+    names += [name[:-1] for name in names]
+    return store, names
+
+
+def _resolve_series(state):
+    store, names = state
+    for name in names:
+        store.resolve_series(name)
+
+
+def _setup_end_to_end(context: Context, build_first: bool):
+    # layout expected by the pipeline: data-loading next to docs/data
+    root = tempfile.mkdtemp(dir=context.directory)
+    working_dir = os.path.join(root, "data-loading")
+    output_dir = os.path.join(root, "docs", "data")
+    os.makedirs(working_dir)
+    os.makedirs(output_dir)
+    if context.scale == 1:
+        shutil.copy(PUBLISHED_PATH, os.path.join(output_dir, "conferences.json"))
+    cache = HttpCache(os.path.join(working_dir, ".cache", "http"))
+    for url, body in (
+        (CCFDDL_BASE_URL, context.allconf),
+        (CCFDDL_ACCEPTANCE_URL, context.allacc),
+        (GUOFEIGU_URL, context.guofeigu),
+    ):
+        cache.store(url, body, etag=None, last_modified=None, encoding="utf-8")
+    state = {"root": root, "working_dir": working_dir, "force": not build_first}
+    if build_first:
+        _end_to_end({**state, "force": True})
+    return state
+
+
+def _end_to_end(state):
+    previous = os.getcwd()
+    os.chdir(state["working_dir"])
+    try:
+        fetcher = Fetcher(cache=HttpCache(".cache/http"), offline=True)
+        sources = [source_cls(fetcher) for source_cls in load_sources()]
+        run(sources, fetcher, PipelineOptions(
+            output_dir="../docs/data",
+            force=state["force"],
+            build_manifest=".cache/build-manifest.json",
+            snapshot=None,
+        ))
+    finally:
+        os.chdir(previous)
+
+
+BENCHMARKS = [
+    Benchmark(
+        "strip_invalid_yaml",
+        lambda context: context.allconf.decode("utf8"),
+        strip_invalid_yaml,
+    ),
+    Benchmark(
+        "load_yaml",
+        lambda context: context.allconf,
+        lambda content: load_yaml(content, "utf8"),
+    ),
+    Benchmark(
+        "CCFDDL._map_to_series",
+        lambda context: (CCFDDL(), ConferenceStore(), load_yaml(context.allconf, "utf8")),
+        lambda state: [state[0]._map_to_series(entry, state[1]) for entry in state[2]],
+    ),
+    Benchmark(
+        "GuofeiGu.iter_statistics",
+        lambda context: context.guofeigu.decode("utf8"),
+        lambda html: list(iter_statistics(html)),
+    ),
+    Benchmark(
+        "normalize_series_name",
+        lambda context: (ConferenceStore(), [entry["title"] for entry in load_yaml(context.allconf, "utf8")]),
+        lambda state: [state[0].normalize_series_name(name) for name in state[1]],
+    ),
+    Benchmark(
+        "add_or_merge_series",
+        lambda context: (_mapped_series(context), _mapped_series(context)),
+        _add_or_merge,
+    ),
+    Benchmark(
+        "find_series",
+        lambda context: (_setup_store(context), [entry["title"] for entry in load_yaml(context.allconf, "utf8")]),
+        _find_series,
+    ),
+    Benchmark(
+        "resolve_series",
+        _setup_resolve_series,
+        _resolve_series,
+    ),
+    Benchmark(
+        "serialize",
+        _setup_store,
+        lambda store: store.serialize(),
+    ),
+    Benchmark(
+        "end_to_end",
+        lambda context: _setup_end_to_end(context, build_first=False),
+        _end_to_end,
+    ),
+    Benchmark(
+        "end_to_end_unchanged",
+        lambda context: _setup_end_to_end(context, build_first=True),
+        _end_to_end,
+    ),
+]
+
+
+def measure(benchmark: Benchmark, context: Context, repeat: int) -> Dict[str, Any]:
+    timings = []
+    cpu_timings = []
+    for _ in range(repeat):
+        state = benchmark.setup(context)
+        reset_caches()
+        gc.collect()
+        start, start_cpu = time.perf_counter(), time.process_time()
+        benchmark.run(state)
+        timings.append(time.perf_counter() - start)
+        cpu_timings.append(time.process_time() - start_cpu)
+
+    # memory in a separate run, tracing slows down the code considerably
+    state = benchmark.setup(context)
+    reset_caches()
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    benchmark.run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": benchmark.name,
+        "scale": context.scale,
+        "repeat": repeat,
+        "best_s": min(timings),
+        "mean_s": statistics.mean(timings),
+        "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "best_cpu_s": min(cpu_timings),
+        "peak_alloc_bytes": peak - baseline,
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--", ".")),
+        "python": sys.version,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def create_context(directory: str, scale: int, fixtures: Optional[str]) -> Context:
+    if fixtures is not None and scale == 1:
+        paths = {name: os.path.join(fixtures, name) for name in (ALLCONF_NAME, ALLACC_NAME, GUOFEIGU_NAME)}
+    else:
+        paths = write_fixtures(os.path.join(directory, f"fixtures-{scale}"), scale)
+
+    def _read(name: str) -> bytes:
+        with open(paths[name], "rb") as f:
+            return f.read()
+
+    return Context(
+        scale=scale,
+        directory=directory,
+        fixtures=paths,
+        allconf=_read(ALLCONF_NAME),
+        allacc=_read(ALLACC_NAME),
+        guofeigu=_read(GUOFEIGU_NAME),
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks the data loading pipeline on local fixtures")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="multiples of today's data size")
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per benchmark at scale 1")
+    parser.add_argument("--only", nargs="+", help="names of the benchmarks to run")
+    parser.add_argument(
+        "--fixtures",
+        help=f"directory with captured {ALLCONF_NAME}, {ALLACC_NAME} and {GUOFEIGU_NAME} used at scale 1 "
+             f"instead of fixtures generated from the published data",
+    )
+    parser.add_argument("--output", help="result file, defaults to a file per run in benchmarks/results")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # sources log every entry they cannot map, which only distorts the timings
+    logging.disable(logging.CRITICAL)
+    benchmarks = [b for b in BENCHMARKS if args.only is None or b.name in args.only]
+    meta = metadata()
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            context = create_context(directory, scale, args.fixtures)
+            # larger scales take long enough to be stable with fewer repetitions
+            repeat = max(1, args.repeat // scale)
+            for benchmark in benchmarks:
+                result = measure(benchmark, context, repeat)
+                results.append(result)
+                print(
+                    f"{benchmark.name:<26} x{scale:<4} best {result['best_s'] * 1000:10.2f} ms  "
+                    f"peak {result['peak_alloc_bytes'] / 1024 / 1024:8.2f} MiB",
+                    file=sys.stderr,
+                )
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = os.path.join(DEFAULT_OUTPUT_DIR, f"{stamp}-{(meta['commit'] or 'unknown')[:10]}.json")
+    with open(output, "w", encoding="utf8") as f:
+        json.dump({"version": RESULTS_VERSION, "meta": meta, "results": results}, f, indent=2, sort_keys=True)
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,104 @@
+import os
+import signal
+import asyncio
 import logging
-import traceback
+import argparse
+import threading
 
 from typing import List
 
-from src.sources import DataSource
-from src.model import ConferenceStore
+from src.cache import HttpCache, DEFAULT_CACHE_DIR
+from src.fetch import Fetcher
+from src.model import Category
+from src.sources import DataSource, SOURCES, BASE_SOURCES, load_sources
+from src.pipeline import PipelineOptions, run, build_or_restore
+from src.daemon import Daemon
+from src.server import QueryServer, DEFAULT_HOST, DEFAULT_PORT
 
 
 logger = logging.getLogger(__name__)
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Loads and normalizes conference data from various sources")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="directory for cached source payloads")
+    parser.add_argument("--no-cache", action="store_true", help="always download full payloads")
+    parser.add_argument("--offline", action="store_true", help="only replay cached payloads, no network access")
+    parser.add_argument("--shards", action="store_true", help="also write per category and year shards with a manifest")
+    parser.add_argument(
+        "--no-publish", action="store_true",
+        help="do not write compact, precompressed data under a content-hashed name, previously published data is removed",
+    )
+    parser.add_argument(
+        "--no-delta", action="store_true",
+        help="do not write a patch against the previous conferences.json to the delta feed",
+    )
+    parser.add_argument("--force", action="store_true", help="rebuild even if no source changed since the last build")
+    parser.add_argument(
+        "--source", action="append", choices=list(SOURCES), dest="sources",
+        help=f"only refresh this source, can be repeated. {', '.join(BASE_SOURCES)} always runs as the base",
+    )
+    parser.add_argument(
+        "--category", action="append", choices=[category.name for category in Category], dest="categories",
+        help="only refresh series of this category, can be repeated",
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="keep running and refresh every source on its own interval, outputs are written when the data changed",
+    )
+    parser.add_argument("--serve", action="store_true", help="serve a query api over the data, see src/server.py")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address the query api listens on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port the query api listens on")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="processes used to map source entries, 1 maps everything in this process",
+    )
+    parser.add_argument("--trace-memory", action="store_true", help="record peak allocations per stage in the run report (slow)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.offline and args.no_cache:
+        parser.error("--offline replays the cache and cannot be combined with --no-cache")
+    return args
+
+
 if __name__ == "__main__":
-    store = ConferenceStore()
-    sources: List[DataSource] = [source_cls() for source_cls in DataSource.sources]
-    for source in sources:
+    args = parse_args()
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    fetcher = Fetcher(cache=cache, offline=args.offline)
+    categories = [Category[name] for name in args.categories] if args.categories else None
+    sources: List[DataSource] = [
+        source_cls(fetcher, categories, workers=args.workers)
+        for source_cls in load_sources(args.sources)
+    ]
+    options = PipelineOptions(
+        shards=args.shards,
+        force=args.force,
+        trace_memory=args.trace_memory,
+        publish=not args.no_publish,
+        delta=not args.no_delta,
+    )
+    if args.daemon and args.serve:
+        daemon = Daemon(sources, fetcher, options)
+        daemon.start()
+        # refreshes run in the background, the server reads the same store under the daemon's lock
+        threading.Thread(target=daemon.loop, daemon=True).start()
+        try:
+            asyncio.run(QueryServer(daemon.store, daemon.lock).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            daemon.stop()
+    elif args.daemon:
+        daemon = Daemon(sources, fetcher, options)
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    elif args.serve:
+        store = build_or_restore(sources, fetcher, options)
         try:
-            source.initial_load_to(store)
-        except:
-            logger.error(traceback.format_exc())
-    for source in sources:
-        source.additional_load_to(store)
-    
-    
-    with open("../docs/data/conferences.json", "w", encoding="utf8") as f:
-        f.write(store.serialize())
\ No newline at end of file
+            asyncio.run(QueryServer(store).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        run(sources, fetcher, options)
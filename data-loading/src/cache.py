@@ -0,0 +1,50 @@
+import os
+import json
+import hashlib
+import logging
+
+from typing import Optional, Dict, Tuple
+
+from .files import write_atomic
+
+
+logger = logging.getLogger(__name__)
+DEFAULT_CACHE_DIR = ".cache/http"
+
+
+# stores response bodies together with their validators (ETag, Last-Modified)
+# one entry per URL, consisting of a body file and a metadata file
+class HttpCache:
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(url.encode("utf8")).hexdigest()[:32]
+        base = os.path.join(self.directory, digest)
+        return base + ".json", base + ".body"
+
+    def load(self, url: str) -> Optional[Tuple[Dict[str, Optional[str]], bytes]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url:
+            logger.warning(f"Cache entry for {url} belongs to {meta.get('url')}, ignoring it")
+            return None
+        return meta, body
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str], encoding: Optional[str]):
+        meta_path, body_path = self._paths(url)
+        # body first, the metadata file marks the entry as complete
+        write_atomic(body_path, body)
+        write_atomic(meta_path, json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "encoding": encoding,
+        }).encode("utf8"))
@@ -0,0 +1,146 @@
+import time
+import logging
+import threading
+import traceback
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from .fetch import Fetcher
+from .model import ConferenceStore
+from .sources import DataSource
+from .pipeline import PipelineOptions, run, write_outputs
+from .incremental import BuildManifest
+from .report import RunReport
+from .snapshot import write_snapshot
+
+
+logger = logging.getLogger(__name__)
+PHASES = ("initial", "additional")
+
+
+# one phase of one source, refreshed on the interval of the source
+@dataclass
+class RefreshJob:
+    source: DataSource
+    phase: str
+    interval: float
+    # time.monotonic() of the next refresh
+    due: float
+    # hash of the payloads merged last, unchanged payloads are not merged again
+    digest: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.phase} {type(self.source).__name__}"
+
+    @property
+    def urls(self) -> List[str]:
+        return getattr(self.source, f"{self.phase}_urls")
+
+    def load_to(self, store: ConferenceStore):
+        getattr(self.source, f"{self.phase}_load_to")(store)
+
+
+# keeps the store resident and refreshes every source phase on its own interval
+# outputs are only written again when a refresh changed the content of the store
+class Daemon:
+    def __init__(self, sources: List[DataSource], fetcher: Fetcher, options: PipelineOptions):
+        self.sources = sources
+        self.fetcher = fetcher
+        self.options = options
+        self.store: Optional[ConferenceStore] = None
+        self.jobs: List[RefreshJob] = []
+        self.written_revision = -1
+        # hashes of the series in the last written conferences.json, so the delta feed only parses changed ones
+        self.series_hashes: Optional[Dict[str, str]] = None
+        # held while merging into the store, readers like the query server take it as well
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        # the first build is a normal forced run of the pipeline, it also writes all outputs
+        self.store = run(self.sources, self.fetcher, replace(self.options, force=True))
+        self.written_revision = self.store.revision
+        self.series_hashes = BuildManifest.load(self.options.build_manifest).series
+        now = time.monotonic()
+        self.jobs = [
+            RefreshJob(
+                source=source,
+                phase=phase,
+                interval=getattr(source, f"{phase}_interval"),
+                due=now + getattr(source, f"{phase}_interval"),
+            )
+            for source in self.sources
+            for phase in PHASES
+            if getattr(source, f"{phase}_interval") is not None
+        ]
+        for job in self.jobs:
+            job.digest = self.fetcher.digest(job.urls)
+        logger.info(f"Refreshing {', '.join(job.name for job in self.jobs)}")
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self, job: RefreshJob, report: RunReport) -> bool:
+        # returns whether the store changed
+        self.fetcher.forget(job.urls)
+        self.fetcher.prefetch(job.urls)
+        digest = self.fetcher.digest(job.urls)
+        if digest is not None and digest == job.digest:
+            logger.info(f"Payloads of {job.name} did not change, skipping")
+            return False
+        revision = self.store.revision
+        try:
+            with self.lock, report.stage(f"{job.phase}_load", type(job.source).__name__, self.store):
+                job.load_to(self.store)
+        except:
+            # the digest stays unchanged, so the payload is merged again on the next refresh
+            logger.error(traceback.format_exc())
+            return self.store.revision != revision
+        job.digest = digest
+        return self.store.revision != revision
+
+    def run_due(self) -> bool:
+        # refreshes all jobs that are due, in source order, and returns whether outputs were written
+        now = time.monotonic()
+        report = RunReport(trace_memory=self.options.trace_memory)
+        for job in self.jobs:
+            if job.due > now:
+                continue
+            job.due = now + job.interval
+            if self.refresh(job, report) and job.phase == "initial":
+                # additional data is only applied to series and years that exist,
+                # so it is merged again even if its payloads did not change
+                for other in self.jobs:
+                    if other.phase == "additional":
+                        other.digest = None
+                        other.due = now
+        if self.store.revision == self.written_revision:
+            return False
+        with report.stage("write_outputs"):
+            self.series_hashes = write_outputs(self.store, self.options, self.series_hashes)
+        if self.options.snapshot is not None:
+            with report.stage("write_snapshot"):
+                write_snapshot(self.store, self.options.snapshot)
+        if self.options.run_report is not None:
+            report.write(self.options.run_report, self.store)
+        self.written_revision = self.store.revision
+        logger.info(f"Store changed, outputs written at revision {self.written_revision}")
+        return True
+
+    def serve_forever(self):
+        self.start()
+        self.loop()
+
+    def loop(self):
+        # refreshes until stop() is called, start() must have been called before
+        if len(self.jobs) == 0:
+            logger.warning("No source has a refresh interval, nothing to do")
+            return
+        while not self._stop.is_set():
+            due = min(job.due for job in self.jobs)
+            # returns early once stop() is called
+            if self._stop.wait(max(0.0, due - time.monotonic())):
+                break
+            self.run_due()
@@ -0,0 +1,81 @@
+import re
+import functools
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Union
+
+
+DATE_CACHE_SIZE = 8192
+
+# the shapes used by nearly all sources, e.g. "2024-08-12 23:59:59-7" or "2024-03-18"
+# offsets follow the forms accepted by dateutil: -7, -07, -07:00 and -0700
+_DATETIME_PATTERN = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[ T](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?"
+    r"(?:(Z)|([+-])(?:(\d{2})(\d{2})|(\d{1,2})(?::(\d{2}))?))?)?"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def fixed_timezone(offset: timedelta) -> timezone:
+    # one shared tzinfo per distinct offset
+    return timezone.utc if offset == timedelta(0) else timezone(offset)
+
+
+def _parse_common_format(text: str) -> Optional[datetime]:
+    match = _DATETIME_PATTERN.fullmatch(text)
+    if match is None:
+        return None
+    (
+        year, month, day, hour, minute, second, fraction,
+        utc, sign, offset_hours_long, offset_minutes_long, offset_hours, offset_minutes
+    ) = match.groups()
+
+    try:
+        tzinfo = None
+        if utc is not None:
+            tzinfo = timezone.utc
+        elif sign is not None:
+            if offset_hours_long is not None:
+                offset = timedelta(hours=int(offset_hours_long), minutes=int(offset_minutes_long))
+            else:
+                offset = timedelta(hours=int(offset_hours), minutes=int(offset_minutes or 0))
+            if sign == "-":
+                offset = -offset
+            tzinfo = fixed_timezone(offset)
+        return datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0),
+            int((fraction or "0").ljust(6, "0")),
+            tzinfo=tzinfo,
+        )
+    except ValueError:
+        # out of range values, leave error handling to dateutil
+        return None
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_datetime(value: str, tz: str = "") -> datetime:
+    # tz is appended to the value, e.g. an offset like "-12" for AoE deadlines
+    text = value + tz
+    date = _parse_common_format(text)
+    if date is not None:
+        return date
+    # dateutil is only imported for the formats the fast path does not cover
+    from dateutil.parser import parse
+    return parse(text)
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date_range(value: str) -> Union[Tuple[datetime, Optional[datetime]], datetime, None]:
+    # conference dates are mostly ranges like "March 18-21, 2024", sometimes a single date
+    import daterangeparser
+    try:
+        return daterangeparser.parse(value)
+    except Exception:
+        pass
+    try:
+        return parse_datetime(value)
+    except Exception:
+        pass
+    return None
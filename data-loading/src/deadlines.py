@@ -0,0 +1,76 @@
+import json
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .files import write_atomic
+from .model import ConferenceStore, Category, CORE_RANKING, core_rank_value
+from .serialization import series_output_key, COMPACT_SEPARATORS
+
+
+DEADLINE_INDEX_NAME = "deadlines.json"
+DEADLINE_INDEX_VERSION = 1
+CONFERENCE_START = "Conference start"
+CONFERENCE_END = "Conference end"
+# single date of the conference, used by CCFDDL when the dates are not a range
+CONFERENCE = "Conference"
+CONFERENCE_EVENTS = (CONFERENCE_START, CONFERENCE_END, CONFERENCE)
+COLUMNS = ["deadline", "conference_start", "series", "year", "rank", "category", "description"]
+
+
+def epoch_millis(date: Optional[datetime]) -> Optional[int]:
+    if date is None:
+        return None
+    # naive dates (conference start/end) are taken as UTC
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+def build_deadline_index(store: ConferenceStore) -> Dict[str, Any]:
+    # one row per deadline, sorted by deadline, so clients can binary search for "now"
+    # series, categories and descriptions are stored once and referenced by position
+    categories = list(Category)
+    category_codes = {category: i for i, category in enumerate(categories)}
+    series_keys: List[str] = []
+    descriptions: Dict[str, int] = {}
+    rows = []
+    for key in sorted(store.series.keys(), key=series_output_key):
+        series = store.series[key]
+        series_code = None
+        for year, conference in sorted(series.conferences.items()):
+            start = next(
+                (event for event in conference.timeline if event.description in (CONFERENCE_START, CONFERENCE)),
+                None,
+            )
+            start_millis = epoch_millis(start.date) if start is not None else None
+            for event in conference.timeline:
+                if event.description in CONFERENCE_EVENTS or event.date is None:
+                    continue
+                if series_code is None:
+                    series_code = len(series_keys)
+                    series_keys.append(series_output_key(key))
+                rows.append([
+                    epoch_millis(event.date),
+                    start_millis,
+                    series_code,
+                    year,
+                    core_rank_value(series),
+                    category_codes[series.category],
+                    descriptions.setdefault(event.description, len(descriptions)),
+                ])
+    rows.sort(key=lambda row: (row[0], row[2], row[3]))
+    return {
+        "version": DEADLINE_INDEX_VERSION,
+        "columns": COLUMNS,
+        "series": series_keys,
+        "categories": [category.value for category in categories],
+        "ranks": CORE_RANKING,
+        "descriptions": list(descriptions.keys()),
+        "rows": rows,
+    }
+
+
+def write_deadline_index(store: ConferenceStore, path: str):
+    index = build_deadline_index(store)
+    write_atomic(path, json.dumps(index, separators=COMPACT_SEPARATORS, sort_keys=True).encode("utf8"))
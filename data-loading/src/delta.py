@@ -0,0 +1,222 @@
+import os
+import json
+import logging
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .files import write_atomic
+from .incremental import hash_bytes
+from .serialization import DEFAULT_SEPARATORS
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+# sequence-numbered patches between consecutive versions of conferences.json
+# a client at sequence n applies the patches n + 1 to latest in order
+# if its sequence is older than the first patch that is still kept, it has to load conferences.json again
+#
+# every patch holds the changes per output key of the series:
+#   added_series        key -> series
+#   removed_series      [key]
+#   changed_series      key -> {field: new value} for name, category, description and rankings
+#   added_conferences   key -> {year: conference}
+#   removed_conferences key -> [year]
+#   changed_conferences key -> {year: {field: new value}} for link and location
+#   added_events        key -> {year: [event]}
+#   removed_events      key -> {year: [event]}, a changed event is removed and added
+#   statistics          key -> {year: statistics or null if removed}
+logger = logging.getLogger(__name__)
+DELTA_DIR = "delta"
+DELTA_INDEX_NAME = "index.json"
+DELTA_VERSION = 1
+# patches kept, older clients have to load the full data
+DELTA_RETENTION = 100
+SERIES_FIELDS = ("name", "category", "description", "rankings")
+CONFERENCE_FIELDS = ("link", "location")
+SECTIONS = (
+    "added_series", "removed_series", "changed_series",
+    "added_conferences", "removed_conferences", "changed_conferences",
+    "added_events", "removed_events", "statistics",
+)
+
+
+def _event_key(event: Dict[str, Any]) -> Tuple[Any, Any]:
+    return event.get("date"), event.get("description")
+
+
+def _diff_timeline(previous: List[Dict], current: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    previous_keys = {_event_key(event) for event in previous}
+    current_keys = {_event_key(event) for event in current}
+    added = [event for event in current if _event_key(event) not in previous_keys]
+    removed = [event for event in previous if _event_key(event) not in current_keys]
+    return added, removed
+
+
+def _diff_series(key: str, previous: Dict[str, Any], current: Dict[str, Any], delta: Dict[str, Any]):
+    fields = {name: current.get(name) for name in SERIES_FIELDS if previous.get(name) != current.get(name)}
+    if fields:
+        delta["changed_series"][key] = fields
+
+    previous_conferences = previous.get("conferences", {})
+    current_conferences = current.get("conferences", {})
+    for year, conference in current_conferences.items():
+        if year not in previous_conferences:
+            delta["added_conferences"].setdefault(key, {})[year] = conference
+            continue
+        old = previous_conferences[year]
+        fields = {name: conference.get(name) for name in CONFERENCE_FIELDS if old.get(name) != conference.get(name)}
+        if fields:
+            delta["changed_conferences"].setdefault(key, {})[year] = fields
+        added, removed = _diff_timeline(old.get("timeline", []), conference.get("timeline", []))
+        if added:
+            delta["added_events"].setdefault(key, {})[year] = added
+        if removed:
+            delta["removed_events"].setdefault(key, {})[year] = removed
+    removed_years = [year for year in previous_conferences if year not in current_conferences]
+    if removed_years:
+        delta["removed_conferences"][key] = removed_years
+
+    previous_statistics = previous.get("acceptance_statistics", {})
+    current_statistics = current.get("acceptance_statistics", {})
+    for year in sorted(set(previous_statistics) | set(current_statistics)):
+        if previous_statistics.get(year) != current_statistics.get(year):
+            delta["statistics"].setdefault(key, {})[year] = current_statistics.get(year)
+
+
+def compute_delta(previous: Dict[str, Dict[str, Any]], current: Dict[str, str], removed: Iterable[str]) -> Dict[str, Any]:
+    # current is the serialized text of the series of the new build that may have changed or were added,
+    # previous the parsed series of the last build with the same keys, removed the keys that are gone
+    delta = {section: [] if section == "removed_series" else {} for section in SECTIONS}
+    for key, text in current.items():
+        series = json.loads(text)
+        if key not in previous:
+            delta["added_series"][key] = series
+        elif previous[key] != series:
+            _diff_series(key, previous[key], series, delta)
+    delta["removed_series"] = sorted(removed)
+    return delta
+
+
+def is_empty(delta: Dict[str, Any]) -> bool:
+    return all(len(delta[section]) == 0 for section in SECTIONS)
+
+
+def read_previous(path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    # the published data before it is overwritten, None without a usable one
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning(f"Could not read previous data for the delta feed: {e}")
+        return None
+
+
+def read_previous_series(path: str, hashes: Dict[str, str], keys: Iterable[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    # only the series in keys out of the previous conferences.json, which must hold exactly
+    # the series in hashes (output key -> hash of the serialized series) as written by write_store
+    # the other series are skipped without parsing them. None if the file does not match the hashes
+    wanted = set(keys)
+    item_separator, key_separator = DEFAULT_SEPARATORS
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            text = f.read()
+    except OSError as e:
+        logger.warning(f"Could not read previous data for the delta feed: {e}")
+        return None
+    order = sorted(hashes)
+    series = {}
+    position = 1
+    for i, key in enumerate(order):
+        prefix = (item_separator if i > 0 else "") + _encode_string(key) + key_separator
+        if not text.startswith(prefix, position):
+            break
+        start = position + len(prefix)
+        # strings never contain an unescaped quote, so the next key can only appear where its series starts
+        if i + 1 < len(order):
+            end = text.find(item_separator + _encode_string(order[i + 1]) + key_separator, start)
+        else:
+            end = len(text) - 1
+        if end < 0:
+            break
+        if key in wanted:
+            if hash_bytes(text[start:end].encode("utf8")) != hashes[key]:
+                break
+            series[key] = json.loads(text[start:end])
+        position = end
+    else:
+        if text[0] == "{" and text[position:] == "}":
+            return series
+    logger.warning("Previous data does not match the last build, skipping the delta feed")
+    return None
+
+
+def _load_index(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf8") as f:
+            index = json.load(f)
+        if index.get("version") == DELTA_VERSION:
+            return index
+        logger.warning(f"Ignoring delta index of version {index.get('version')}")
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable delta index: {e}")
+    return {"version": DELTA_VERSION, "latest": 0, "patches": []}
+
+
+def _patch_name(sequence: int) -> str:
+    return f"{sequence:08d}.json"
+
+
+def write_delta(
+    delta: Dict[str, Any],
+    output_dir: str,
+    previous_sha256: Optional[str],
+    sha256: Optional[str],
+    retention: int = DELTA_RETENTION,
+) -> Optional[int]:
+    # returns the sequence of the written patch, None if nothing changed
+    if is_empty(delta):
+        return None
+    delta_dir = os.path.join(output_dir, DELTA_DIR)
+    os.makedirs(delta_dir, exist_ok=True)
+    index_path = os.path.join(delta_dir, DELTA_INDEX_NAME)
+    index = _load_index(index_path)
+    sequence = index["latest"] + 1
+    created = datetime.now(timezone.utc).isoformat()
+    patch = {
+        "version": DELTA_VERSION,
+        "sequence": sequence,
+        "created": created,
+        # hashes of conferences.json the patch applies to and results in
+        "previous_sha256": previous_sha256,
+        "sha256": sha256,
+        **delta,
+    }
+    data = json.dumps(patch, sort_keys=True, separators=(",", ":")).encode("utf8")
+    write_atomic(os.path.join(delta_dir, _patch_name(sequence)), data)
+
+    patches = index["patches"] + [{
+        "sequence": sequence,
+        "path": _patch_name(sequence),
+        "created": created,
+        "size": len(data),
+        "previous_sha256": previous_sha256,
+        "sha256": sha256,
+    }]
+    kept, removed = patches[-retention:], patches[:-retention]
+    # the index goes before removing old patches, so it never lists a patch that is gone
+    write_atomic(index_path, json.dumps(
+        {"version": DELTA_VERSION, "latest": sequence, "sha256": sha256, "patches": kept},
+        sort_keys=True,
+    ).encode("utf8"))
+    for entry in removed:
+        path = os.path.join(delta_dir, entry["path"])
+        if os.path.exists(path):
+            logger.info(f"Removing old patch {entry['path']}")
+            os.unlink(path)
+    logger.info(f"Wrote patch {sequence} of the delta feed ({len(data)} bytes)")
+    return sequence
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import threading
+
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from .cache import HttpCache
+
+
+logger = logging.getLogger(__name__)
+# seconds to connect and between received bytes, a stalled connection must not block later refreshes
+FETCH_TIMEOUT = (10, 60)
+
+
+@dataclass
+class Payload:
+    url: str
+    status_code: int
+    content: bytes
+    encoding: Optional[str] = None
+    # True if the body was replayed from the cache instead of downloaded
+    from_cache: bool = False
+
+    @property
+    def apparent_encoding(self) -> Optional[str]:
+        from requests.compat import chardet
+        return chardet.detect(self.content)["encoding"]
+
+    @property
+    def text(self) -> str:
+        # same decoding rules as requests.Response.text
+        encoding = self.encoding or self.apparent_encoding
+        try:
+            return str(self.content, encoding, errors="replace")
+        except (LookupError, TypeError):
+            return str(self.content, errors="replace")
+
+
+# downloads source payloads through one pooled session shared by all sources
+# with a cache, requests are conditional and unchanged payloads are replayed from disk
+# in offline mode, only the cache is used and nothing is downloaded
+# requests is imported with the first download, runs from the cache do not need it
+class Fetcher:
+    def __init__(self, max_workers: int = 8, cache: Optional[HttpCache] = None, offline: bool = False):
+        if offline and cache is None:
+            raise ValueError("Offline mode requires a cache to replay payloads from")
+        self.max_workers = max_workers
+        self.cache = cache
+        self.offline = offline
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.responses: Dict[str, Payload] = {}
+
+    @property
+    def session(self):
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def _download(self, url: str) -> Payload:
+        cached = self.cache.load(url) if self.cache is not None else None
+        if self.offline:
+            if cached is None:
+                logger.error(f"No cached payload for {url} available in offline mode")
+                # same status as a Cache-Control: only-if-cached miss
+                return Payload(url=url, status_code=504, content=b"")
+            meta, body = cached
+            return Payload(url=url, status_code=200, content=body, encoding=meta["encoding"], from_cache=True)
+
+        headers = {}
+        if cached is not None:
+            meta, _ = cached
+            if meta["etag"] is not None:
+                headers["If-None-Match"] = meta["etag"]
+            if meta["last_modified"] is not None:
+                headers["If-Modified-Since"] = meta["last_modified"]
+        # a timeout raises requests.Timeout, an OSError like every other failed download
+        r = self.session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+        if r.status_code == 304 and cached is not None:
+            meta, body = cached
+            return Payload(url=url, status_code=200, content=body, encoding=meta["encoding"], from_cache=True)
+
+        from requests.utils import get_encoding_from_headers
+        encoding = get_encoding_from_headers(r.headers)
+        if r.status_code == 200 and self.cache is not None:
+            try:
+                self.cache.store(
+                    url, r.content,
+                    etag=r.headers.get("ETag"),
+                    last_modified=r.headers.get("Last-Modified"),
+                    encoding=encoding,
+                )
+            except OSError as e:
+                logger.warning(f"Could not cache {url}: {e}")
+        return Payload(url=url, status_code=r.status_code, content=r.content, encoding=encoding)
+
+    def prefetch(self, urls: Iterable[str]):
+        # deduplicate while keeping the order of first occurrence
+        urls = [url for url in dict.fromkeys(urls) if url not in self.responses]
+        if len(urls) == 0:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            futures = {url: executor.submit(self._download, url) for url in urls}
+        for url, future in futures.items():
+            try:
+                self.responses[url] = future.result()
+            except OSError as e:
+                # requests.RequestException is an OSError
+                # not fatal here, get() retries and raises in the context of the source
+                logger.warning(f"Could not prefetch {url}: {e}")
+
+    def get(self, url: str) -> Payload:
+        if url not in self.responses:
+            self.responses[url] = self._download(url)
+        return self.responses[url]
+
+    def forget(self, urls: Iterable[str]):
+        # the next get() fetches these urls again, revalidating against the cache
+        for url in urls:
+            self.responses.pop(url, None)
+
+    def transfer_statistics(self, urls: Iterable[str]) -> Dict[str, int]:
+        # sizes of the payloads fetched so far, replayed ones were not downloaded in this run
+        statistics = {"payloads": 0, "payload_bytes": 0, "downloaded_bytes": 0, "cached_bytes": 0}
+        for url in dict.fromkeys(urls):
+            payload = self.responses.get(url)
+            if payload is None:
+                continue
+            statistics["payloads"] += 1
+            statistics["payload_bytes"] += len(payload.content)
+            statistics["cached_bytes" if payload.from_cache else "downloaded_bytes"] += len(payload.content)
+        return statistics
+
+    def digest(self, urls: List[str]) -> Optional[str]:
+        # content hash over the payloads of the given urls, None if any could not be fetched
+        digest = hashlib.sha256()
+        for url in urls:
+            try:
+                payload = self.get(url)
+            except OSError:
+                return None
+            digest.update(f"{url} {payload.status_code} {len(payload.content)}\n".encode("utf8"))
+            digest.update(payload.content)
+        return digest.hexdigest()
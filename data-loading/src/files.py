@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+# permissions of newly created files, as mkstemp always uses 0600
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_open(path: str, mode: str = "w", encoding: str = "utf8") -> Iterator[IO]:
+    # write to a temporary file in the same directory and rename it over the target,
+    # so readers never observe a partially written file
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_atomic(path: str, data: bytes):
+    with atomic_open(path, "wb") as f:
+        f.write(data)
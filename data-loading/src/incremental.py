@@ -0,0 +1,105 @@
+import os
+import json
+import hashlib
+import logging
+
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Optional
+
+from .files import write_atomic
+
+
+logger = logging.getLogger(__name__)
+BUILD_MANIFEST_PATH = ".cache/build-manifest.json"
+BUILD_MANIFEST_VERSION = 2
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: str) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def hash_code(root: str) -> str:
+    # changes to the pipeline itself (including data files like aliases.yml) invalidate previous builds as well
+    digest = hashlib.sha256()
+    paths = [os.path.join(root, "main.py")]
+    for directory, _, files in os.walk(os.path.join(root, "src")):
+        paths.extend(os.path.join(directory, name) for name in files if name.endswith((".py", ".yml")))
+    for path in sorted(paths):
+        digest.update(os.path.relpath(path, root).encode("utf8"))
+        digest.update(hash_file(path).encode("utf8") if os.path.exists(path) else b"")
+    return digest.hexdigest()
+
+
+# content hashes of everything that went into and came out of the last build
+@dataclass
+class BuildManifest:
+    code: Optional[str] = None
+    sources: Dict[str, Optional[str]] = field(default_factory=dict) # source -> hash of its payloads
+    outputs: Dict[str, Optional[str]] = field(default_factory=dict) # path -> hash
+    series: Dict[str, str] = field(default_factory=dict) # output key -> hash of serialized series
+    # source -> names of the categories it refreshed, None for all
+    # a build restricted to some categories only applied part of the payloads
+    categories: Dict[str, Optional[List[str]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str = BUILD_MANIFEST_PATH) -> "BuildManifest":
+        try:
+            with open(path, "r", encoding="utf8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != BUILD_MANIFEST_VERSION:
+            return cls()
+        return cls(
+            code=data["code"],
+            sources=data["sources"],
+            outputs=data["outputs"],
+            series=data["series"],
+            categories=data["categories"],
+        )
+
+    def save(self, path: str = BUILD_MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {"version": BUILD_MANIFEST_VERSION, **asdict(self)}
+        write_atomic(path, json.dumps(data, sort_keys=True).encode("utf8"))
+
+    def is_up_to_date(
+        self,
+        code: str,
+        sources: Dict[str, Optional[str]],
+        outputs: Iterable[str],
+        categories: Dict[str, Optional[List[str]]],
+    ) -> bool:
+        # a source without hash could not be fetched, so its state is unknown
+        if self.code != code or self.sources != sources or None in sources.values():
+            return False
+        # the same payloads may have been applied to other categories only
+        if self.categories != categories:
+            return False
+        # outputs must still be exactly what the last build wrote
+        # conferences.json is also the input of the Own source
+        return all(self.is_current_output(path) for path in outputs)
+
+    def is_current_output(self, path: str) -> bool:
+        # whether the file is still exactly what the last build wrote
+        return self.outputs.get(path) is not None and hash_file(path) == self.outputs[path]
+
+    def changed_series(self, series: Dict[str, str]) -> Dict[str, int]:
+        previous = set(self.series)
+        current = set(series)
+        return {
+            "added": len(current - previous),
+            "removed": len(previous - current),
+            "changed": sum(1 for key in current & previous if self.series[key] != series[key]),
+        }
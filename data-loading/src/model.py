@@ -1,15 +1,23 @@
 import re
-import json
+import sys
+import bisect
 import logging
-import dataclasses
+import functools
 
 from enum import Enum
-from datetime import datetime
+from datetime import datetime, timezone
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, Set
+
+from .dates import fixed_timezone
+from .serialization import iter_store_chunks
+from .names import NameIndex, load_aliases
 
 
 logger = logging.getLogger(__name__)
+NAME_CACHE_SIZE = 4096
+_WHITESPACE = re.compile(r"\s")
+_REPEATED_SPACES = re.compile(r" {2,}")
 
 
 class Category(str, Enum):
@@ -25,26 +33,118 @@ class Category(str, Enum):
     Other = "Other"
 
 
-@dataclass
+def _intern(value):
+    # repeated strings (event descriptions, locations, ranking keys) share a single copy
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(frozen=True, slots=True)
 class AcceptanceStatistics:
     accepted: int
     submitted: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Event:
     date: datetime
     description: str
 
+    def __post_init__(self):
+        object.__setattr__(self, "description", _intern(self.description))
 
-@dataclass
+    def __reduce__(self):
+        # unpickled events (e.g. mapped in worker processes) share descriptions and timezones again
+        return (_restore_event, (self.date, self.description))
+
+
+def _restore_event(date: Optional[datetime], description: str) -> Event:
+    if date is not None and isinstance(date.tzinfo, timezone):
+        date = date.replace(tzinfo=fixed_timezone(date.utcoffset()))
+    return Event(date=date, description=description)
+
+
+def _event_sort_key(date: Optional[datetime]) -> Tuple[int, datetime]:
+    # naive dates (e.g. conference start) are ordered as if they were UTC
+    # events without a date go last
+    if date is None:
+        return (1, datetime.min.replace(tzinfo=timezone.utc))
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return (0, date)
+
+
+# events of a conference, kept sorted by date and free of duplicates
+# equal (date, description) pairs are detected through a hash index of the events
+class Timeline:
+    __slots__ = ("_events", "_index")
+
+    def __init__(self, events: Iterable[Event] = ()):
+        self._events: List[Event] = []
+        self._index: Set[Event] = set()
+        for event in events:
+            self.add(event)
+
+    def add(self, event: Event) -> bool:
+        # returns whether the event was new
+        if event in self._index:
+            return False
+        self._index.add(event)
+        # insert after events with the same date, so ties keep their arrival order
+        position = bisect.bisect_right(
+            self._events, _event_sort_key(event.date),
+            key=lambda e: _event_sort_key(e.date),
+        )
+        self._events.insert(position, event)
+        return True
+
+    def next_after(self, date: datetime) -> Optional[Event]:
+        # first dated event at or after the given date
+        position = bisect.bisect_left(
+            self._events, _event_sort_key(date),
+            key=lambda e: _event_sort_key(e.date),
+        )
+        if position == len(self._events) or self._events[position].date is None:
+            return None
+        return self._events[position]
+
+    def __contains__(self, event: Event) -> bool:
+        return event in self._index
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __getitem__(self, index: int) -> Event:
+        return self._events[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Timeline):
+            return self._events == other._events
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Timeline({self._events!r})"
+
+
+@dataclass(slots=True)
 class Conference:
     link: str
     location: str
-    timeline: List[Event]
+    timeline: Timeline
 
+    def __post_init__(self):
+        self.location = _intern(self.location)
+        if not isinstance(self.timeline, Timeline):
+            self.timeline = Timeline(self.timeline)
 
-@dataclass
+    def __reduce__(self):
+        # through the constructor, so __post_init__ interns again after unpickling
+        return (Conference, (self.link, self.location, self.timeline))
+
+
+@dataclass(slots=True)
 class ConferenceSeries:
     name: str
     category: Category
@@ -53,29 +153,166 @@ class ConferenceSeries:
     conferences: Dict[int, Conference] # year -> conference
     acceptance_statistics: Dict[int, AcceptanceStatistics] # year -> stats
 
+    def __post_init__(self):
+        self.rankings = {
+            _intern(ranking_org): _intern(rank)
+            for ranking_org, rank in self.rankings.items()
+        }
+
+    def __reduce__(self):
+        # through the constructor, so __post_init__ interns again after unpickling
+        return (ConferenceSeries, (
+            self.name, self.category, self.description,
+            self.rankings, self.conferences, self.acceptance_statistics,
+        ))
+
+
+# ordering of CORE ranks, higher is better
+CORE_RANKING = {
+    "A*": 4,
+    "A": 3,
+    "B": 2,
+    "C": 1,
+    "N": 0,
+}
+
+
+def core_rank_value(series: ConferenceSeries) -> int:
+    if "core" not in series.rankings:
+        return 0
+    return CORE_RANKING.get(series.rankings["core"], 0)
+
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def normalize_series_name(name: str) -> str:
+    # remove organization names
+    name = _WHITESPACE.sub(" ", name)
+    name = name.replace("IEEE ", "")
+    name = name.replace("ACM ", "")
+    # remove superfluous whitespace, only spaces are left at this point
+    return _REPEATED_SPACES.sub(" ", name).lstrip(" ")
+
+
+@functools.lru_cache(maxsize=NAME_CACHE_SIZE)
+def series_key(name: str) -> str:
+    # canonical form of a series name, used for all lookups in the store
+    return normalize_series_name(name).lower()
+
+
+# what happened to the entries handed to a store, reported per pipeline stage
+@dataclass
+class StoreCounters:
+    added: int = 0
+    merged: int = 0
+    conflicts: int = 0
+    statistics_mismatches: int = 0
+    # entries a source could not map or match to any series
+    skipped: int = 0
+
 
 class ConferenceStore:
     def __init__(self):
         self.series: Dict[Tuple[str, Category], ConferenceSeries] = {}
+        self.counters = StoreCounters()
+        # incremented on every change of the content, merges without any new data keep it
+        self.revision = 0
+        # secondary indexes, kept up to date by add_or_merge_series and enrich_series
+        self._by_name: Dict[str, Dict[Category, ConferenceSeries]] = {}
+        self._by_category: Dict[Category, Dict[str, ConferenceSeries]] = {}
+        self._by_core_rank: Dict[Optional[str], Dict[Tuple[str, Category], ConferenceSeries]] = {}
+        # name -> candidates sorted by rank, computed on first use
+        self._ranked_candidates: Dict[str, List[ConferenceSeries]] = {}
+        # resolves names used by other sources, see build_name_index
+        self._name_index: Optional[NameIndex] = None
+        self._resolved: Dict[Tuple[str, Optional[Category]], Optional[str]] = {}
+
+    def _index(self, key: Tuple[str, Category], series: ConferenceSeries):
+        name, category = key
+        self._by_name.setdefault(name, {})[category] = series
+        self._by_category.setdefault(category, {})[name] = series
+        self._by_core_rank.setdefault(series.rankings.get("core"), {})[key] = series
+        self._ranked_candidates.pop(name, None)
+        if self._name_index is not None:
+            self._name_index.add(name, series_key(series.description))
+            self._resolved.clear()
+
+    def _reindex_core_rank(self, key: Tuple[str, Category], series: ConferenceSeries, previous_rank: Optional[str]):
+        rank = series.rankings.get("core")
+        if rank != previous_rank:
+            del self._by_core_rank[previous_rank][key]
+            self._by_core_rank.setdefault(rank, {})[key] = series
+        # rank or number of conferences may have changed
+        self._ranked_candidates.pop(key[0], None)
     
-    def add_or_merge_series(self, series: ConferenceSeries):
-        key = (series.name.lower(), series.category)
+    def add_or_merge_series(self, series: ConferenceSeries, replace_timelines: bool = False):
+        # with replace_timelines, the timeline of every conference the series supplies replaces the one in the store
+        # sources that supply complete timelines use it, so events they dropped (e.g. moved deadlines) are removed
+        key = (series_key(series.name), series.category)
         if key not in self.series:
             self.series[key] = series
+            self._index(key, series)
+            self.counters.added += 1
+            self.revision += 1
             return
         # already exists in store, so need to merge attributes
+        self._merge_into(
+            key, series.name, series.category,
+            description=series.description,
+            rankings=series.rankings,
+            conferences=series.conferences,
+            acceptance_statistics=series.acceptance_statistics,
+            replace_timelines=replace_timelines,
+        )
+
+    def enrich_series(
+        self,
+        name: str,
+        category: Category,
+        rankings: Optional[Dict[str, str]] = None,
+        conferences: Optional[Dict[int, Conference]] = None,
+        acceptance_statistics: Optional[Dict[int, AcceptanceStatistics]] = None,
+    ) -> bool:
+        # applies a partial update to an existing series in place
+        # same conflict rules as add_or_merge_series, but without copying the whole series
+        key = (series_key(name), category)
+        if key not in self.series:
+            logger.warning(f"Cannot enrich series that is not in store! {name} {category}")
+            self.counters.skipped += 1
+            return False
+        return self._merge_into(
+            key, name, category,
+            description=None,
+            rankings=rankings or {},
+            conferences=conferences or {},
+            acceptance_statistics=acceptance_statistics or {},
+        )
+
+    def _merge_into(
+        self,
+        key: Tuple[str, Category],
+        name: str,
+        category: Category,
+        description: Optional[str],
+        rankings: Dict[str, str],
+        conferences: Dict[int, Conference],
+        acceptance_statistics: Dict[int, AcceptanceStatistics],
+        replace_timelines: bool = False,
+    ) -> bool:
         existing = self.series[key]
+        previous_rank = existing.rankings.get("core")
         
         # check for any inconsistencies that cannot be handled by merging
-        if existing.description != series.description:
-            logger.error(f"Description of two series to merge does not match! {series.name} {series.category}")
-            return
+        if description is not None and existing.description != description:
+            logger.error(f"Description of two series to merge does not match! {name} {category}")
+            self.counters.conflicts += 1
+            return False
         if any(
-            ranking_org in series.rankings and series.rankings[ranking_org] != existing.rankings[ranking_org]
+            ranking_org in rankings and rankings[ranking_org] != existing.rankings[ranking_org]
             for ranking_org in existing.rankings.keys()
         ):
-            logger.error(f"Ranking of two series to merge does not match! {series.name} {series.category}")
-            return
+            logger.error(f"Ranking of two series to merge does not match! {name} {category}")
+            self.counters.conflicts += 1
+            return False
         
         def _are_conferences_mergeable(left: Conference, right: Conference) -> bool:
             if left.link != right.link:
@@ -86,84 +323,123 @@ class ConferenceStore:
             return True
 
         if any(
-            year in series.conferences and not _are_conferences_mergeable(series.conferences[year], existing.conferences[year])
+            year in conferences and not _are_conferences_mergeable(conferences[year], existing.conferences[year])
             for year in existing.conferences.keys()
         ):
-            logger.error(f"Conferences of two series to merge do not match! {series.name} {series.category}")
-            return
+            logger.error(f"Conferences of two series to merge do not match! {name} {category}")
+            self.counters.conflicts += 1
+            return False
         if any(
-            year in series.acceptance_statistics and series.acceptance_statistics[year] != existing.acceptance_statistics[year]
+            year in acceptance_statistics and acceptance_statistics[year] != existing.acceptance_statistics[year]
             for year in existing.acceptance_statistics.keys()
         ):
             logger.warning(
-                f"Statistics of two series to merge do not match! Series name: {series.name}, Category: {series.category.value}. "
+                f"Statistics of two series to merge do not match! Series name: {name}, Category: {category.value}. "
                 f"Will be merged based on best-effort."
             )
+            self.counters.statistics_mismatches += 1
 
         # series are mergeable
+        changed = False
         
-        for ranking_org, rank in series.rankings.items():
+        for ranking_org, rank in rankings.items():
             # safe because of previous check
+            changed = changed or existing.rankings.get(ranking_org) != rank
             existing.rankings[ranking_org] = rank
-        for year, stats in series.acceptance_statistics.items():
+        for year, stats in acceptance_statistics.items():
             # best-effort
+            changed = changed or existing.acceptance_statistics.get(year) != stats
             existing.acceptance_statistics[year] = stats
 
-        for year, conference in series.conferences.items():
+        for year, conference in conferences.items():
             if year not in existing.conferences:
                 existing.conferences[year] = conference
+                changed = True
                 continue
             # link and location must be identical, because of previous check
             # therefore only merge timelines:
             # - if any existing event matches exactly, skip
             # - otherwise add event to timeline
+            # or, with replace_timelines, take over the timeline of the new conference
+            if replace_timelines:
+                if existing.conferences[year].timeline != conference.timeline:
+                    existing.conferences[year].timeline = conference.timeline
+                    changed = True
+                continue
             for event in conference.timeline:
-                if event in existing.conferences[year].timeline:
-                    continue
-                existing.conferences[year].timeline.append(event)
+                if existing.conferences[year].timeline.add(event):
+                    changed = True
 
-        self.series[key] = existing
+        self._reindex_core_rank(key, existing, previous_rank)
+        self.counters.merged += 1
+        if changed:
+            self.revision += 1
+        return True
 
     def normalize_series_name(self, name: str) -> str:
-        # remove organization names
-        name = re.sub(r"\s", " ", name)
-        name = name.replace("IEEE ", "")
-        name = name.replace("ACM ", "")
-
-        # remove superfluous whitespace
-        previous = ""
-        while previous != name:
-            previous = name
-            name = re.sub(r"\s\s+", " ", name)
-            name = re.sub(r"^\s", "", name)
-
-        return name
-    
-    def find_series(self, name: Optional[str] = None, category: Optional[Category] = None) -> List[ConferenceSeries]:
-        name = name.lower()
-        if name is None and category is None:
-            raise ValueError("To find series, supply either the name, category or both")
-        if name is None:
-            return [
-                series
-                for ((name, category), series) in self.series.items()
-                if category == category
-            ]
-        if category is None:
-            return [
-                self.series[(name, cat)]
-                for cat in Category
-                if (name, cat) in self.series
-            ]
-        if (name, category) not in self.series:
+        return normalize_series_name(name)
+
+    def find_series(
+        self,
+        name: Optional[str] = None,
+        category: Optional[Category] = None,
+        core_rank: Optional[str] = None,
+    ) -> List[ConferenceSeries]:
+        if name is None and category is None and core_rank is None:
+            raise ValueError("To find series, supply either the name, category, core rank or a combination")
+        if name is not None:
+            by_category = self._by_name.get(series_key(name), {})
+            if category is None:
+                candidates = [by_category[cat] for cat in Category if cat in by_category]
+            elif category in by_category:
+                candidates = [by_category[category]]
+            else:
+                candidates = []
+        elif category is not None:
+            candidates = list(self._by_category.get(category, {}).values())
+        else:
+            return list(self._by_core_rank.get(core_rank, {}).values())
+        if core_rank is not None:
+            candidates = [series for series in candidates if series.rankings.get("core") == core_rank]
+        return candidates
+
+    def rank_candidates(self, name: str) -> List[ConferenceSeries]:
+        # all series with this name, ordered by how likely they are meant
+        # better conference would be more important
+        # higher rank or higher number of years in case of tie
+        name = series_key(name)
+        if name not in self._ranked_candidates:
+            self._ranked_candidates[name] = sorted(
+                self.find_series(name=name),
+                key=lambda c: (core_rank_value(c), len(c.conferences)),
+                reverse=True, # descending, higher values first
+            )
+        return list(self._ranked_candidates[name])
+
+    def build_name_index(self, aliases: Optional[Dict[str, str]] = None):
+        # built once after the initial load, series added afterwards are indexed as they are added
+        # aliases maps alternative names to series names, by default read from aliases.yml
+        aliases = aliases if aliases is not None else load_aliases()
+        self._name_index = NameIndex({series_key(alias): series_key(name) for alias, name in aliases.items()})
+        self._resolved.clear()
+        for (name, _), series in self.series.items():
+            self._name_index.add(name, series_key(series.description))
+
+    def resolve_series(self, name: str, category: Optional[Category] = None) -> List[ConferenceSeries]:
+        # like rank_candidates, but also resolves aliases, alternative and slightly different names
+        if self._name_index is None:
+            self.build_name_index()
+        cache_key = (series_key(name), category)
+        if cache_key not in self._resolved:
+            accepts = None if category is None else lambda resolved: category in self._by_name[resolved]
+            self._resolved[cache_key] = self._name_index.resolve(cache_key[0], accepts)
+        resolved = self._resolved[cache_key]
+        if resolved is None:
             return []
-        return [self.series[(name, category)]]
+        candidates = self.rank_candidates(resolved)
+        if category is not None:
+            candidates = [series for series in candidates if series.category == category]
+        return candidates
     
     def serialize(self) -> str:
-        return json.dumps({
-                f"{name}__CAT{category.name}": dataclasses.asdict(series)
-                for (name, category), series in self.series.items()
-            },
-            default=str,
-            sort_keys=True,
-        )
\ No newline at end of file
+        return "".join(iter_store_chunks(self))
@@ -0,0 +1,113 @@
+import os
+import re
+import logging
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set
+
+
+# resolution of the names used by other sources to the series in the store
+# all names are series keys (normalized and lower case, see model.series_key)
+# a name is resolved by trying, in this order:
+#   1. the name of a series
+#   2. the alias table in aliases.yml
+#   3. alternative names of a series: parts of names like "UbiComp/ISWC", descriptions
+#      and acronyms in parentheses, as long as only one series uses them
+#   4. near matches on character trigrams, only for long enough names above a high threshold
+logger = logging.getLogger(__name__)
+ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aliases.yml")
+# dice coefficient of the trigrams, anything lower matches different series too easily
+FUZZY_THRESHOLD = 0.85
+# short names (e.g. acronyms) differ in single characters, so they are never matched fuzzily
+FUZZY_MIN_LENGTH = 6
+_NAME_SEPARATOR = re.compile(r"\s*/\s*")
+_PARENTHESES = re.compile(r"\(([^()]+)\)")
+
+
+def load_aliases(path: str = ALIASES_PATH) -> Dict[str, str]:
+    # alias -> name of the series, as written in the file
+    if not os.path.exists(path):
+        return {}
+    import yaml
+    with open(path, "r", encoding="utf8") as f:
+        aliases = yaml.safe_load(f) or {}
+    return {str(alias): str(name) for alias, name in aliases.items()}
+
+
+def trigrams(name: str) -> Set[str]:
+    # padded, so the start and end of a name weigh more than its middle
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def alternative_names(name: str, description: str) -> Iterable[str]:
+    parts = _NAME_SEPARATOR.split(name)
+    if len(parts) > 1:
+        yield from parts
+    yield description
+    # e.g. "network and distributed system security (ndss) symposium"
+    for acronym in _PARENTHESES.findall(description):
+        yield acronym.strip()
+    yield " ".join(_PARENTHESES.sub(" ", description).split())
+
+
+class NameIndex:
+    def __init__(self, aliases: Dict[str, str]):
+        self.aliases = aliases
+        self.names: Set[str] = set()
+        # alternative name -> names of the series using it
+        self._alternatives: Dict[str, Set[str]] = {}
+        # trigram -> names containing it
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._trigram_counts: Dict[str, int] = {}
+
+    def add(self, name: str, description: str):
+        if name not in self.names:
+            self.names.add(name)
+            grams = trigrams(name)
+            self._trigram_counts[name] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(name)
+        for alternative in alternative_names(name, description):
+            if alternative and alternative != name:
+                self._alternatives.setdefault(alternative, set()).add(name)
+
+    def resolve(self, name: str, accepts: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        # name of the series meant by name, None if there is none or it is ambiguous
+        # accepts restricts the names considered, e.g. to series of one category
+        accepts = accepts if accepts is not None else lambda _: True
+        if name in self.names and accepts(name):
+            return name
+        alias = self.aliases.get(name)
+        if alias in self.names and accepts(alias):
+            return alias
+        candidates = [candidate for candidate in self._alternatives.get(name, ()) if accepts(candidate)]
+        if len(candidates) == 1:
+            return candidates[0]
+        if len(candidates) > 1:
+            logger.debug(f"{name} is used by several series: {', '.join(sorted(candidates))}")
+            return None
+        return self._resolve_fuzzy(name, accepts)
+
+    def _resolve_fuzzy(self, name: str, accepts: Callable[[str], bool]) -> Optional[str]:
+        if len(name) < FUZZY_MIN_LENGTH:
+            return None
+        grams = trigrams(name)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        scores = sorted(
+            (
+                (2 * count / (len(grams) + self._trigram_counts[candidate]), candidate)
+                for candidate, count in shared.items()
+                if len(candidate) >= FUZZY_MIN_LENGTH and accepts(candidate)
+            ),
+            reverse=True,
+        )
+        if len(scores) == 0 or scores[0][0] < FUZZY_THRESHOLD:
+            return None
+        if len(scores) > 1 and scores[1][0] >= FUZZY_THRESHOLD:
+            logger.debug(f"{name} is close to several series: {scores[0][1]}, {scores[1][1]}")
+            return None
+        logger.info(f"Resolved {name} to {scores[0][1]} by near match ({scores[0][0]:.2f})")
+        return scores[0][1]
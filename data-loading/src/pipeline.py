@@ -0,0 +1,220 @@
+import os
+import logging
+import traceback
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+
+from .fetch import Fetcher
+from .files import atomic_open
+from .model import ConferenceStore
+from .sources import DataSource
+from .serialization import write_store
+from .shards import write_shards, SHARD_DIR, MANIFEST_NAME
+from .deadlines import write_deadline_index, DEADLINE_INDEX_NAME
+from .incremental import BuildManifest, BUILD_MANIFEST_PATH, hash_bytes, hash_file, hash_code
+from .snapshot import SnapshotReader, SnapshotError, SNAPSHOT_PATH, write_snapshot
+from .report import RunReport, RUN_REPORT_PATH
+from .publish import publish, unpublish, POINTER_NAME
+from .delta import compute_delta, read_previous, read_previous_series, write_delta
+
+
+logger = logging.getLogger(__name__)
+OUTPUT_DIR = "../docs/data"
+CODE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class PipelineOptions:
+    output_dir: str = OUTPUT_DIR
+    shards: bool = False
+    # rebuild even if no source changed
+    force: bool = False
+    build_manifest: str = BUILD_MANIFEST_PATH
+    # internal state of the previous build, None to always restore from the published json
+    snapshot: Optional[str] = SNAPSHOT_PATH
+    # timings and counters of the run, None to only log them
+    run_report: Optional[str] = RUN_REPORT_PATH
+    trace_memory: bool = False
+    # also write content-hashed, precompressed data with a pointer to it, see src/publish.py
+    # without, previously published data is removed, so the pointer never names outdated data
+    publish: bool = True
+    # sequence-numbered patches against the previous conferences.json, see src/delta.py
+    delta: bool = True
+
+
+def output_paths(options: PipelineOptions) -> List[str]:
+    paths = [
+        os.path.join(options.output_dir, "conferences.json"),
+        os.path.join(options.output_dir, DEADLINE_INDEX_NAME),
+    ]
+    if options.shards:
+        paths.append(os.path.join(options.output_dir, SHARD_DIR, MANIFEST_NAME))
+    if options.publish:
+        paths.append(os.path.join(options.output_dir, POINTER_NAME))
+    if options.snapshot is not None:
+        paths.append(options.snapshot)
+    return paths
+
+
+def restore_snapshot(path: Optional[str]) -> Optional[ConferenceStore]:
+    if path is None or not os.path.exists(path):
+        return None
+    store = ConferenceStore()
+    try:
+        with SnapshotReader(path) as snapshot:
+            snapshot.load_into(store)
+    except SnapshotError as e:
+        logger.warning(f"Ignoring snapshot: {e}")
+        return None
+    return store
+
+
+def load_store(
+    sources: List[DataSource],
+    store: Optional[ConferenceStore] = None,
+    report: Optional[RunReport] = None,
+) -> ConferenceStore:
+    store = store if store is not None else ConferenceStore()
+    report = report if report is not None else RunReport()
+    for source in sources:
+        try:
+            with report.stage("initial_load", type(source).__name__, store):
+                source.initial_load_to(store)
+        except:
+            logger.error(traceback.format_exc())
+    # additional data is matched against the series of the initial load
+    with report.stage("build_name_index"):
+        store.build_name_index()
+    for source in sources:
+        with report.stage("additional_load", type(source).__name__, store):
+            source.additional_load_to(store)
+    return store
+
+
+def write_outputs(
+    store: ConferenceStore,
+    options: PipelineOptions,
+    previous_series: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
+    # returns the content hash of every serialized series
+    # previous_series are the hashes returned for the last build, if conferences.json is still exactly what it wrote.
+    # the delta feed then only parses the series whose hash changed, otherwise it compares all of them
+    series_hashes = {}
+    series_texts = {}
+    path = os.path.join(options.output_dir, "conferences.json")
+    previous_hash = hash_file(path) if options.delta else None
+    # the data of the previous build, exactly what Own restores
+    previous = read_previous(path) if previous_hash is not None and previous_series is None else None
+
+    def _track(key: str, text: str):
+        series_hashes[key] = hash_bytes(text.encode("utf8"))
+        if previous is not None or (previous_series is not None and previous_series.get(key) != series_hashes[key]):
+            series_texts[key] = text
+
+    with atomic_open(path) as f:
+        write_store(store, f, on_series=_track)
+        if previous_hash is not None and previous_series is not None:
+            # the previous file is only replaced when leaving this block
+            removed = [key for key in previous_series if key not in series_hashes]
+            if series_texts or removed:
+                changed = [key for key in series_texts if key in previous_series]
+                previous = read_previous_series(path, previous_series, changed)
+        elif previous is not None:
+            removed = [key for key in previous if key not in series_hashes]
+    if previous is not None:
+        write_delta(compute_delta(previous, series_texts, removed), options.output_dir, previous_hash, hash_file(path))
+    write_deadline_index(store, os.path.join(options.output_dir, DEADLINE_INDEX_NAME))
+    if options.shards:
+        write_shards(store, options.output_dir)
+    if options.publish:
+        publish(store, options.output_dir)
+    else:
+        unpublish(options.output_dir)
+    return series_hashes
+
+
+def run(sources: List[DataSource], fetcher: Fetcher, options: PipelineOptions) -> Optional[ConferenceStore]:
+    # returns the built store, or None if nothing changed since the last build
+    report = RunReport(trace_memory=options.trace_memory)
+    store = None
+    try:
+        store = _run(sources, fetcher, options, report)
+    finally:
+        report.log_summary()
+        if options.run_report is not None:
+            report.write(options.run_report, store)
+    return store
+
+
+def _run(sources: List[DataSource], fetcher: Fetcher, options: PipelineOptions, report: RunReport) -> Optional[ConferenceStore]:
+    # download all payloads in parallel up front, merging below stays sequential
+    # in source order, so the resulting store is deterministic
+    with report.stage("prefetch"):
+        fetcher.prefetch(
+            url
+            for source in sources
+            for url in source.initial_urls + source.additional_urls
+        )
+    for source in sources:
+        report.record_source(
+            type(source).__name__,
+            fetcher.transfer_statistics(source.initial_urls + source.additional_urls),
+        )
+
+    manifest = BuildManifest.load(options.build_manifest)
+    code = hash_code(CODE_ROOT)
+    source_hashes = {
+        type(source).__name__: fetcher.digest(source.initial_urls + source.additional_urls)
+        for source in sources
+    }
+    source_categories = {
+        type(source).__name__: sorted(category.name for category in source.categories) if source.categories is not None else None
+        for source in sources
+    }
+    outputs = output_paths(options)
+    if not options.force and manifest.is_up_to_date(code, source_hashes, outputs, source_categories):
+        logger.info("No source changed since the last build, skipping")
+        report.skipped = True
+        return None
+
+    store = None
+    # the snapshot holds the state behind the conferences.json of the last build
+    # if that file changed since (e.g. edited or pulled from git), it is restored from the file instead
+    unchanged = manifest.is_current_output(os.path.join(options.output_dir, "conferences.json"))
+    if unchanged:
+        with report.stage("restore_snapshot"):
+            store = restore_snapshot(options.snapshot)
+    elif options.snapshot is not None and os.path.exists(options.snapshot):
+        logger.info("conferences.json changed since the last build, ignoring the snapshot")
+    if store is not None:
+        # the snapshot replaces restoring the state from the published json
+        sources = [source for source in sources if not source.restores_state]
+    store = load_store(sources, store, report)
+    with report.stage("write_outputs"):
+        # the series hashes of the manifest only describe conferences.json as long as it is unchanged
+        series_hashes = write_outputs(store, options, manifest.series if unchanged else None)
+    if options.snapshot is not None:
+        with report.stage("write_snapshot"):
+            write_snapshot(store, options.snapshot)
+
+    changes = manifest.changed_series(series_hashes)
+    logger.info(f"Series changed since the last build: {changes}")
+    BuildManifest(
+        code=code,
+        sources=source_hashes,
+        outputs={path: hash_file(path) for path in outputs},
+        series=series_hashes,
+        categories=source_categories,
+    ).save(options.build_manifest)
+    return store
+
+
+def build_or_restore(sources: List[DataSource], fetcher: Fetcher, options: PipelineOptions) -> ConferenceStore:
+    # the current store, rebuilt only if a source changed since the last build
+    store = run(sources, fetcher, options)
+    if store is None:
+        store = restore_snapshot(options.snapshot)
+    if store is None:
+        store = run(sources, fetcher, replace(options, force=True))
+    return store
@@ -0,0 +1,106 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+import logging
+
+from typing import Any, Dict
+
+from .files import write_atomic
+from .model import ConferenceStore
+from .serialization import iter_store_chunks, COMPACT_SEPARATORS
+
+# optional, see the brotli extra in pyproject.toml
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# publication artifacts for static hosting
+# the data is written compact under a content-hashed name, so it can be cached forever,
+# next to precompressed siblings for hosts that serve them directly (e.g. nginx gzip_static)
+# the small pointer file is the only one that has to be revalidated by clients
+logger = logging.getLogger(__name__)
+POINTER_NAME = "conferences.latest.json"
+POINTER_VERSION = 1
+HASH_LENGTH = 16
+# published versions that are kept, including the current one
+# clients holding an older pointer can still fetch the data it names
+PUBLISH_RETENTION = 3
+ENCODING_SUFFIXES = {"identity": "", "gzip": ".gz", "br": ".br"}
+_PUBLISHED_FILE = re.compile(r"^conferences\.([0-9a-f]{%d})\.json(\.gz|\.br)?$" % HASH_LENGTH)
+
+
+def _encodings(data: bytes) -> Dict[str, bytes]:
+    encoded = {
+        "identity": data,
+        # no timestamp in the header, so equal data always compresses to equal bytes
+        "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        encoded["br"] = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+    return encoded
+
+
+def publish(store: ConferenceStore, output_dir: str, retention: int = PUBLISH_RETENTION) -> Dict[str, Any]:
+    # returns the pointer
+    data = "".join(iter_store_chunks(store, COMPACT_SEPARATORS)).encode("utf8")
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"conferences.{digest[:HASH_LENGTH]}.json"
+    files = {}
+    for encoding, body in _encodings(data).items():
+        path = name + ENCODING_SUFFIXES[encoding]
+        full_path = os.path.join(output_dir, path)
+        if os.path.exists(full_path):
+            # content-addressed, so the file already holds these bytes. Only mark it as recent
+            os.utime(full_path)
+        else:
+            write_atomic(full_path, body)
+        files[encoding] = {"path": path, "size": len(body)}
+
+    pointer = {
+        "version": POINTER_VERSION,
+        "path": name,
+        "sha256": digest,
+        "size": len(data),
+        "series": len(store.series),
+        "encodings": files,
+    }
+    # the pointer goes last, so it never names a file that is not written yet
+    write_atomic(os.path.join(output_dir, POINTER_NAME), json.dumps(pointer, sort_keys=True).encode("utf8"))
+    logger.info(f"Published {name} ({', '.join(f'{encoding} {file['size']} bytes' for encoding, file in files.items())})")
+    remove_old_versions(output_dir, digest[:HASH_LENGTH], retention)
+    return pointer
+
+
+def unpublish(output_dir: str):
+    # removes the pointer and all published versions, e.g. when a build does not publish
+    # otherwise the website would keep loading the data the pointer names instead of conferences.json
+    if not os.path.isdir(output_dir):
+        return
+    pointer_path = os.path.join(output_dir, POINTER_NAME)
+    if os.path.exists(pointer_path):
+        logger.info(f"Removing {POINTER_NAME}, this build is not published")
+        os.unlink(pointer_path)
+    for name in os.listdir(output_dir):
+        if _PUBLISHED_FILE.match(name) is not None:
+            os.unlink(os.path.join(output_dir, name))
+
+
+def remove_old_versions(output_dir: str, current: str, retention: int):
+    # keeps the current version and the most recently published ones before it
+    versions: Dict[str, float] = {}
+    for name in os.listdir(output_dir):
+        match = _PUBLISHED_FILE.match(name)
+        if match is not None:
+            modified = os.path.getmtime(os.path.join(output_dir, name))
+            versions[match.group(1)] = max(versions.get(match.group(1), 0.0), modified)
+    previous = sorted((version for version in versions if version != current), key=versions.get, reverse=True)
+    stale = set(previous[max(0, retention - 1):])
+    for name in os.listdir(output_dir):
+        match = _PUBLISHED_FILE.match(name)
+        if match is not None and match.group(1) in stale:
+            logger.info(f"Removing old published file {name}")
+            os.unlink(os.path.join(output_dir, name))
@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import tracemalloc
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from .files import write_atomic
+from .model import ConferenceStore, StoreCounters
+
+try:
+    import resource
+except ImportError:
+    # not available on windows
+    resource = None
+
+
+logger = logging.getLogger(__name__)
+# kept with the other state of the build, not next to the published outputs,
+# so runs that change nothing do not change published files either
+RUN_REPORT_PATH = ".cache/run-report.json"
+RUN_REPORT_VERSION = 1
+
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+@dataclass
+class StageReport:
+    stage: str
+    source: Optional[str] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    # only measured with trace_memory, tracing slows down the pipeline considerably
+    peak_alloc_bytes: Optional[int] = None
+    # counters of the store accumulated during the stage
+    counters: Dict[str, int] = field(default_factory=dict)
+    failed: bool = False
+
+
+# collects timings, allocations and store counters of one pipeline run
+class RunReport:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.started = datetime.now(timezone.utc)
+        self.stages: List[StageReport] = []
+        self.sources: Dict[str, Dict[str, int]] = {}
+        self.skipped = False
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, stage: str, source: Optional[str] = None, store: Optional[ConferenceStore] = None) -> Iterator[StageReport]:
+        # exceptions are recorded and passed on to the caller
+        report = StageReport(stage=stage, source=source)
+        before = asdict(store.counters) if store is not None else None
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield report
+        except:
+            report.failed = True
+            raise
+        finally:
+            report.wall_s = time.perf_counter() - start_wall
+            report.cpu_s = time.process_time() - start_cpu
+            if self.trace_memory:
+                report.peak_alloc_bytes = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            if tracing:
+                tracemalloc.stop()
+            if store is not None:
+                after = asdict(store.counters)
+                report.counters = {name: after[name] - before[name] for name in after}
+            self.stages.append(report)
+
+    def record_source(self, name: str, statistics: Dict[str, int]):
+        self.sources[name] = statistics
+
+    def to_dict(self, store: Optional[ConferenceStore] = None) -> Dict[str, Any]:
+        totals = store.counters if store is not None else StoreCounters()
+        return {
+            "version": RUN_REPORT_VERSION,
+            "started": self.started.isoformat(),
+            "python": platform.python_version(),
+            "skipped": self.skipped,
+            "trace_memory": self.trace_memory,
+            "wall_s": time.perf_counter() - self._start_wall,
+            "cpu_s": time.process_time() - self._start_cpu,
+            "max_rss_bytes": _max_rss_bytes(),
+            "series": len(store.series) if store is not None else None,
+            "counters": asdict(totals),
+            "sources": self.sources,
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def write(self, path: str, store: Optional[ConferenceStore] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_atomic(path, json.dumps(self.to_dict(store), indent=2).encode("utf8"))
+
+    def log_summary(self):
+        for stage in self.stages:
+            name = stage.stage if stage.source is None else f"{stage.stage} {stage.source}"
+            logger.info(f"{name}: {stage.wall_s * 1000:.1f} ms wall, {stage.cpu_s * 1000:.1f} ms cpu, {stage.counters}")
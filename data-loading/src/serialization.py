@@ -0,0 +1,119 @@
+import json
+
+from typing import IO, Callable, Iterable, Iterator, Optional, Tuple
+
+
+# produces the same output as json.dumps(dataclasses.asdict(...), default=str, sort_keys=True)
+# but walks the model directly and yields one chunk per series
+DEFAULT_SEPARATORS = (", ", ": ")
+COMPACT_SEPARATORS = (",", ":")
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+class StoreSerializer:
+    def __init__(self, separators: Tuple[str, str] = DEFAULT_SEPARATORS):
+        self.item_separator, self.key_separator = separators
+
+    def _value(self, value) -> str:
+        if type(value) is str:
+            return _encode_string(value)
+        if type(value) is int:
+            return int.__repr__(value)
+        # anything the sources handed through unchanged, e.g. the rankings dict
+        return json.dumps(
+            value,
+            default=str,
+            sort_keys=True,
+            separators=(self.item_separator, self.key_separator),
+        )
+
+    def _date(self, date) -> str:
+        if date is None:
+            return "null"
+        return _encode_string(str(date))
+
+    def _object(self, members: Iterable[Tuple[str, str]]) -> str:
+        # members must already be sorted by key
+        return "{" + self.item_separator.join(
+            _encode_string(key) + self.key_separator + value
+            for key, value in members
+        ) + "}"
+
+    def _int_keyed(self, items, encode) -> str:
+        # sort_keys orders integer keys numerically before converting them
+        return "{" + self.item_separator.join(
+            f'"{key}"' + self.key_separator + encode(value)
+            for key, value in sorted(items)
+        ) + "}"
+
+    def _event(self, event) -> str:
+        return self._object((
+            ("date", self._date(event.date)),
+            ("description", self._value(event.description)),
+        ))
+
+    def _conference(self, conference) -> str:
+        return self._object((
+            ("link", self._value(conference.link)),
+            ("location", self._value(conference.location)),
+            ("timeline", "[" + self.item_separator.join(self._event(event) for event in conference.timeline) + "]"),
+        ))
+
+    def _statistics(self, statistics) -> str:
+        return self._object((
+            ("accepted", self._value(statistics.accepted)),
+            ("submitted", self._value(statistics.submitted)),
+        ))
+
+    def series(self, series) -> str:
+        return self._object((
+            ("acceptance_statistics", self._int_keyed(series.acceptance_statistics.items(), self._statistics)),
+            ("category", _encode_string(series.category.value)),
+            ("conferences", self._int_keyed(series.conferences.items(), self._conference)),
+            ("description", self._value(series.description)),
+            ("name", self._value(series.name)),
+            ("rankings", self._value(series.rankings)),
+        ))
+
+    def iter_chunks(
+        self,
+        items: Iterable[Tuple[str, object]],
+        on_series: Optional[Callable[[str, str], None]] = None,
+    ) -> Iterator[str]:
+        # items are (output key, series) pairs, in any order
+        # on_series is called with the key and serialized text of every series
+        yield "{"
+        for i, (key, series) in enumerate(sorted(items, key=lambda item: item[0])):
+            separator = self.item_separator if i > 0 else ""
+            text = self.series(series)
+            if on_series is not None:
+                on_series(key, text)
+            yield separator + _encode_string(key) + self.key_separator + text
+        yield "}"
+
+
+def series_output_key(key) -> str:
+    name, category = key
+    return f"{name}__CAT{category.name}"
+
+
+def iter_store_chunks(
+    store,
+    separators: Tuple[str, str] = DEFAULT_SEPARATORS,
+    on_series: Optional[Callable[[str, str], None]] = None,
+) -> Iterator[str]:
+    return StoreSerializer(separators).iter_chunks(
+        ((series_output_key(key), series) for key, series in store.series.items()),
+        on_series=on_series,
+    )
+
+
+def write_store(
+    store,
+    f: IO[str],
+    separators: Tuple[str, str] = DEFAULT_SEPARATORS,
+    on_series: Optional[Callable[[str, str], None]] = None,
+):
+    for chunk in iter_store_chunks(store, separators, on_series):
+        f.write(chunk)
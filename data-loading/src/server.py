@@ -0,0 +1,296 @@
+import gzip
+import json
+import time
+import bisect
+import asyncio
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from .model import ConferenceStore, Category, CORE_RANKING, series_key
+from .deadlines import build_deadline_index
+from .serialization import StoreSerializer, series_output_key, COMPACT_SEPARATORS
+
+
+logger = logging.getLogger(__name__)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# smaller bodies are not worth compressing
+GZIP_MIN_SIZE = 1024
+RESPONSE_CACHE_SIZE = 256
+MAX_HEADER_SIZE = 64 * 1024
+KEEP_ALIVE_TIMEOUT = 30
+
+_CATEGORIES = {
+    **{category.name.lower(): category for category in Category},
+    **{category.value.lower(): category for category in Category},
+}
+
+
+class QueryError(Exception):
+    pass
+
+
+# everything the endpoints need, built once per revision of the store
+# so requests never touch the store while a refresh may be merging into it
+@dataclass
+class QueryIndex:
+    revision: int
+    # sorted by deadline, epoch milliseconds
+    deadlines: List[int]
+    # (category, rank value, response item) per deadline, same order
+    rows: List[Tuple[Category, int, Dict[str, Any]]]
+    # canonical name -> serialized series, in category order
+    series: Dict[str, List[str]]
+
+    @classmethod
+    def build(cls, store: ConferenceStore) -> "QueryIndex":
+        index = build_deadline_index(store)
+        by_output_key = {series_output_key(key): series for key, series in store.series.items()}
+        categories = list(Category)
+        deadlines = []
+        rows = []
+        for deadline, start, series_code, year, rank, category_code, description_code in index["rows"]:
+            key = index["series"][series_code]
+            series = by_output_key[key]
+            deadlines.append(deadline)
+            rows.append((categories[category_code], rank, {
+                "deadline": deadline,
+                "conference_start": start,
+                "series": key,
+                "name": series.name,
+                "year": year,
+                "category": series.category.value,
+                "core": series.rankings.get("core"),
+                "description": index["descriptions"][description_code],
+                "link": series.conferences[year].link,
+            }))
+
+        serializer = StoreSerializer(COMPACT_SEPARATORS)
+        series = {}
+        for value in sorted(store.series.values(), key=lambda value: categories.index(value.category)):
+            series.setdefault(series_key(value.name), []).append(serializer.series(value))
+        return cls(revision=store.revision, deadlines=deadlines, rows=rows, series=series)
+
+
+def _single(query: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else None
+
+
+def _integer(query: Dict[str, List[str]], name: str, default: int, minimum: int, maximum: int) -> int:
+    value = _single(query, name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if not minimum <= number <= maximum:
+        raise QueryError(f"{name} must be between {minimum} and {maximum}")
+    return number
+
+
+def parse_timestamp(value: str) -> int:
+    # epoch milliseconds or ISO 8601, naive times are taken as UTC
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        date = datetime.fromisoformat(value)
+    except ValueError:
+        raise QueryError("after must be epoch milliseconds or an ISO 8601 timestamp")
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+def query_deadlines(index: QueryIndex, query: Dict[str, List[str]], now: int) -> Dict[str, Any]:
+    # now is the default for after, in epoch milliseconds
+    after = _single(query, "after")
+    after = parse_timestamp(after) if after is not None else now
+    categories = None
+    if "category" in query:
+        try:
+            categories = {_CATEGORIES[value.lower()] for value in query["category"]}
+        except KeyError as e:
+            raise QueryError(f"Unknown category {e.args[0]}")
+    min_rank = _single(query, "min_rank")
+    if min_rank is not None and min_rank not in CORE_RANKING:
+        raise QueryError(f"min_rank must be one of {', '.join(CORE_RANKING)}")
+    min_rank_value = CORE_RANKING[min_rank] if min_rank is not None else 0
+    limit = _integer(query, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+    offset = _integer(query, "offset", 0, 0, len(index.rows))
+
+    # rows are sorted by deadline, so everything before "after" is skipped by binary search
+    start = bisect.bisect_left(index.deadlines, after)
+    matches = [
+        item
+        for category, rank, item in index.rows[start:]
+        if (categories is None or category in categories) and rank >= min_rank_value
+    ]
+    return {
+        "total": len(matches),
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + limit if offset + limit < len(matches) else None,
+        "items": matches[offset:offset + limit],
+    }
+
+
+def query_series(index: QueryIndex, query: Dict[str, List[str]]) -> str:
+    # returns the json text directly, the series are already serialized
+    name = _single(query, "name")
+    if name is None:
+        raise QueryError("name is required")
+    return "[" + ",".join(index.series.get(series_key(name), [])) + "]"
+
+
+# read-only HTTP/1.1 api over a store, with ETags, gzip and pagination
+#   GET /deadlines?after=&category=&min_rank=&limit=&offset=
+#   GET /series?name=
+# lock is held by writers of the store (e.g. the daemon) while they merge
+class QueryServer:
+    def __init__(self, store: ConferenceStore, lock: Optional[threading.Lock] = None):
+        self.store = store
+        self.lock = lock if lock is not None else threading.Lock()
+        self.index: Optional[QueryIndex] = None
+        self._rebuild_lock = asyncio.Lock()
+        # (target, revision, minute) -> (etag, body), polled queries are answered without recomputing
+        self._responses: "OrderedDict[Tuple[str, int, int], Tuple[str, bytes]]" = OrderedDict()
+
+    def _build_index(self) -> QueryIndex:
+        with self.lock:
+            return QueryIndex.build(self.store)
+
+    async def current_index(self) -> QueryIndex:
+        if self.index is None or self.index.revision != self.store.revision:
+            async with self._rebuild_lock:
+                if self.index is None or self.index.revision != self.store.revision:
+                    # building takes a while and waits for running merges, keep the loop responsive
+                    self.index = await asyncio.to_thread(self._build_index)
+                    self._responses.clear()
+        return self.index
+
+    def _render(self, path: str, query: Dict[str, List[str]], index: QueryIndex, now: int) -> bytes:
+        if path == "/deadlines":
+            return json.dumps(query_deadlines(index, query, now), separators=COMPACT_SEPARATORS).encode("utf8")
+        if path == "/series":
+            return query_series(index, query).encode("utf8")
+        raise LookupError(path)
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        if method not in ("GET", "HEAD"):
+            return self._error(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported")
+        index = await self.current_index()
+        # "now" advances in whole minutes, so polled responses stay cacheable in between
+        minute = int(time.time() // 60)
+        cache_key = (target, index.revision, minute)
+        if cache_key in self._responses:
+            self._responses.move_to_end(cache_key)
+            etag, body = self._responses[cache_key]
+        else:
+            url = urlsplit(target)
+            try:
+                body = self._render(url.path, parse_qs(url.query), index, minute * 60 * 1000)
+            except QueryError as e:
+                return self._error(HTTPStatus.BAD_REQUEST, str(e))
+            except LookupError:
+                return self._error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {url.path}")
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self._responses[cache_key] = (etag, body)
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+
+        use_gzip = "gzip" in headers.get("accept-encoding", "") and len(body) >= GZIP_MIN_SIZE
+        if use_gzip:
+            # representations differ, so do their validators
+            etag = etag[:-1] + '-gzip"'
+        response_headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None and (if_none_match.strip() == "*" or etag in (
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        )):
+            return HTTPStatus.NOT_MODIFIED, response_headers, b""
+        if use_gzip:
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            response_headers["Content-Encoding"] = "gzip"
+        return HTTPStatus.OK, response_headers, body
+
+    def _error(self, status: HTTPStatus, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps({"error": message}).encode("utf8")
+        return status, {"Content-Type": "application/json; charset=utf-8"}, body
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ")
+                except ValueError:
+                    await self._write(writer, "HTTP/1.1", "HEAD", *self._error(HTTPStatus.BAD_REQUEST, "Malformed request"), close=True)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                status, response_headers, body = await self.respond(method, target, headers)
+                connection = headers.get("connection", "").lower()
+                close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+                await self._write(writer, version, method, status, response_headers, body, close)
+                if close:
+                    return
+        except ConnectionError:
+            pass
+        except:
+            logger.exception("Failed to handle request")
+        finally:
+            writer.close()
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        version: str,
+        method: str,
+        status: int,
+        headers: Dict[str, str],
+        body: bytes,
+        close: bool,
+    ):
+        status = HTTPStatus(status)
+        lines = [f"{'HTTP/1.0' if version == 'HTTP/1.0' else 'HTTP/1.1'} {status.value} {status.phrase}"]
+        headers = {**headers, "Connection": "close" if close else "keep-alive"}
+        if status != HTTPStatus.NOT_MODIFIED:
+            headers["Content-Length"] = str(len(body))
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD" and status != HTTPStatus.NOT_MODIFIED:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        await self.current_index()
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_SIZE)
+        logger.info(f"Serving queries on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
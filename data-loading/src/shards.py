@@ -0,0 +1,88 @@
+import os
+import json
+import hashlib
+import logging
+import dataclasses
+
+from typing import Dict, List, Optional, Tuple
+
+from .files import write_atomic
+from .model import ConferenceStore, ConferenceSeries, Category
+from .serialization import StoreSerializer, series_output_key
+
+
+logger = logging.getLogger(__name__)
+SHARD_DIR = "shards"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# shard for series without any year bound data
+UNDATED = "undated"
+
+
+def _split_by_year(series: ConferenceSeries) -> Dict[Optional[int], ConferenceSeries]:
+    # each slice carries the series metadata, but only the conference and statistics of one year
+    years = sorted(set(series.conferences) | set(series.acceptance_statistics))
+    if len(years) == 0:
+        return {None: series}
+    return {
+        year: dataclasses.replace(
+            series,
+            conferences={year: series.conferences[year]} if year in series.conferences else {},
+            acceptance_statistics={year: series.acceptance_statistics[year]} if year in series.acceptance_statistics else {},
+        )
+        for year in years
+    }
+
+
+def build_shards(store: ConferenceStore) -> Dict[Tuple[Category, Optional[int]], List[Tuple[str, ConferenceSeries]]]:
+    shards = {}
+    for key, series in store.series.items():
+        output_key = series_output_key(key)
+        for year, series_slice in _split_by_year(series).items():
+            shards.setdefault((series.category, year), []).append((output_key, series_slice))
+    return shards
+
+
+def _shard_path(category: Category, year: Optional[int]) -> str:
+    # relative to the manifest
+    return f"{category.name}/{UNDATED if year is None else year}.json"
+
+
+def write_shards(store: ConferenceStore, output_dir: str):
+    # merging the series of all shards by key restores the full conferences.json
+    shard_dir = os.path.join(output_dir, SHARD_DIR)
+    serializer = StoreSerializer()
+    entries = []
+    written = set()
+    shards = build_shards(store)
+    for category, year in sorted(shards.keys(), key=lambda k: (k[0].name, k[1] is None, k[1] or 0)):
+        items = shards[(category, year)]
+        data = "".join(serializer.iter_chunks(items)).encode("utf8")
+        path = _shard_path(category, year)
+        full_path = os.path.join(shard_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        write_atomic(full_path, data)
+        written.add(os.path.normpath(full_path))
+        entries.append({
+            "category": category.value,
+            "category_key": category.name,
+            "year": year,
+            "path": path,
+            "series": len(items),
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+
+    # the manifest goes last, so it never lists a shard that is not written yet
+    manifest = {"version": MANIFEST_VERSION, "shards": entries}
+    manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+    write_atomic(manifest_path, json.dumps(manifest, sort_keys=True).encode("utf8"))
+    written.add(os.path.normpath(manifest_path))
+
+    # remove shards of categories or years that no longer exist
+    for root, _, files in os.walk(shard_dir):
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path.endswith(".json") and path not in written:
+                logger.info(f"Removing stale shard {path}")
+                os.unlink(path)
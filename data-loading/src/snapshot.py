@@ -0,0 +1,263 @@
+import os
+import mmap
+import json
+import struct
+import logging
+
+from datetime import datetime, timedelta
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from .dates import fixed_timezone
+from .files import atomic_open
+from .model import (
+    AcceptanceStatistics, Category, Conference, ConferenceSeries,
+    ConferenceStore, Event
+)
+
+
+logger = logging.getLogger(__name__)
+SNAPSHOT_PATH = ".cache/store.snapshot"
+
+# binary snapshot of a ConferenceStore, all integers little endian
+#   header: magic, version, record count, offset of the index
+#   records: one length-prefixed record per series
+#   index: (offset, length, name, category) per record, read on open
+# dates are stored pre-parsed as microseconds since the epoch plus UTC offset
+SNAPSHOT_MAGIC = b"CFSN"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<4sHxxIQ")
+_INDEX_ENTRY = struct.Struct("<QI")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+_DATE = struct.Struct("<Bqq")
+_STATISTICS = struct.Struct("<iqq")
+
+_DATE_NONE = 0
+_DATE_NAIVE = 1
+_DATE_AWARE = 2
+_VALUE_STR = 0
+_VALUE_JSON = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_CATEGORIES = {category.name: category for category in Category}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _microseconds(delta: timedelta) -> int:
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class _RecordWriter:
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def str(self, value: str):
+        data = value.encode("utf8")
+        self.parts.append(_U32.pack(len(data)))
+        self.parts.append(data)
+
+    def value(self, value):
+        # sources may hand through other types than strings, which are kept as json
+        if type(value) is str:
+            self.parts.append(bytes((_VALUE_STR,)))
+            self.str(value)
+        else:
+            self.parts.append(bytes((_VALUE_JSON,)))
+            self.str(json.dumps(value, default=str))
+
+    def count(self, value: int):
+        self.parts.append(_U32.pack(value))
+
+    def date(self, date: Optional[datetime]):
+        if date is None:
+            self.parts.append(_DATE.pack(_DATE_NONE, 0, 0))
+            return
+        # wall time, the offset is stored separately
+        wall = _microseconds(date.replace(tzinfo=None) - _EPOCH)
+        offset = date.utcoffset()
+        if offset is None:
+            self.parts.append(_DATE.pack(_DATE_NAIVE, wall, 0))
+        else:
+            self.parts.append(_DATE.pack(_DATE_AWARE, wall, _microseconds(offset)))
+
+    def series(self, series: ConferenceSeries) -> bytes:
+        self.parts = []
+        self.str(series.name)
+        self.str(series.category.name)
+        self.value(series.description)
+        self.count(len(series.rankings))
+        for ranking_org, rank in series.rankings.items():
+            self.str(ranking_org)
+            self.value(rank)
+        self.count(len(series.conferences))
+        for year, conference in series.conferences.items():
+            self.parts.append(_I32.pack(year))
+            self.value(conference.link)
+            self.value(conference.location)
+            self.count(len(conference.timeline))
+            for event in conference.timeline:
+                self.date(event.date)
+                self.value(event.description)
+        self.count(len(series.acceptance_statistics))
+        for year, statistics in series.acceptance_statistics.items():
+            self.parts.append(_STATISTICS.pack(year, statistics.accepted, statistics.submitted))
+        return b"".join(self.parts)
+
+
+class _RecordReader:
+    def __init__(self, data: memoryview):
+        self.data = data
+        self.position = 0
+
+    def _unpack(self, layout: struct.Struct) -> Tuple:
+        values = layout.unpack_from(self.data, self.position)
+        self.position += layout.size
+        return values
+
+    def str(self) -> str:
+        (length,) = self._unpack(_U32)
+        value = str(self.data[self.position:self.position + length], "utf8")
+        self.position += length
+        return value
+
+    def value(self):
+        tag = self.data[self.position]
+        self.position += 1
+        if tag == _VALUE_STR:
+            return self.str()
+        return json.loads(self.str())
+
+    def count(self) -> int:
+        return self._unpack(_U32)[0]
+
+    def date(self) -> Optional[datetime]:
+        kind, wall, offset = self._unpack(_DATE)
+        if kind == _DATE_NONE:
+            return None
+        date = _EPOCH + timedelta(microseconds=wall)
+        if kind == _DATE_NAIVE:
+            return date
+        return date.replace(tzinfo=fixed_timezone(timedelta(microseconds=offset)))
+
+    def series(self) -> ConferenceSeries:
+        name = self.str()
+        category = _CATEGORIES[self.str()]
+        description = self.value()
+        rankings = {}
+        for _ in range(self.count()):
+            ranking_org = self.str()
+            rankings[ranking_org] = self.value()
+        conferences = {}
+        for _ in range(self.count()):
+            (year,) = self._unpack(_I32)
+            link = self.value()
+            location = self.value()
+            timeline = []
+            for _ in range(self.count()):
+                date = self.date()
+                timeline.append(Event(date=date, description=self.value()))
+            conferences[year] = Conference(link=link, location=location, timeline=timeline)
+        acceptance_statistics = {}
+        for _ in range(self.count()):
+            year, accepted, submitted = self._unpack(_STATISTICS)
+            acceptance_statistics[year] = AcceptanceStatistics(accepted=accepted, submitted=submitted)
+        return ConferenceSeries(
+            name=name,
+            category=category,
+            description=description,
+            rankings=rankings,
+            conferences=conferences,
+            acceptance_statistics=acceptance_statistics,
+        )
+
+
+def _write_str(f: IO[bytes], value: str):
+    data = value.encode("utf8")
+    f.write(_U32.pack(len(data)))
+    f.write(data)
+
+
+def write_snapshot(store: ConferenceStore, path: str = SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = _RecordWriter()
+    with atomic_open(path, "wb") as f:
+        # header is rewritten once the position of the index is known
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, 0))
+        index = []
+        for (name, category), series in store.series.items():
+            record = writer.series(series)
+            index.append((f.tell(), len(record), name, category))
+            f.write(record)
+        index_offset = f.tell()
+        for offset, length, name, category in index:
+            f.write(_INDEX_ENTRY.pack(offset, length))
+            _write_str(f, name)
+            _write_str(f, category.name)
+        f.seek(0)
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(index), index_offset))
+
+
+# memory maps a snapshot and decodes series only when they are requested
+class SnapshotReader:
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise SnapshotError(f"Snapshot {path} is truncated")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = memoryview(self._mmap)
+        try:
+            magic, version, count, index_offset = _HEADER.unpack_from(self._data, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise SnapshotError(f"{path} is not a snapshot")
+            if version != SNAPSHOT_VERSION:
+                raise SnapshotError(f"Snapshot {path} has unsupported version {version}")
+            reader = _RecordReader(self._data)
+            reader.position = index_offset
+            # key -> (offset, length), in the order the series were stored
+            self._index: Dict[Tuple[str, Category], Tuple[int, int]] = {}
+            for _ in range(count):
+                offset, length = reader._unpack(_INDEX_ENTRY)
+                name = reader.str()
+                category = _CATEGORIES[reader.str()]
+                self._index[(name, category)] = (offset, length)
+        except (struct.error, KeyError, UnicodeDecodeError) as e:
+            self.close()
+            raise SnapshotError(f"Snapshot {path} is corrupt: {e}")
+        except:
+            self.close()
+            raise
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._data is not None:
+            self._data.release()
+            self._data = None
+            self._mmap.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[str, Category]) -> bool:
+        return key in self._index
+
+    def keys(self) -> Iterator[Tuple[str, Category]]:
+        return iter(self._index.keys())
+
+    def load_series(self, key: Tuple[str, Category]) -> ConferenceSeries:
+        offset, length = self._index[key]
+        try:
+            return _RecordReader(self._data[offset:offset + length]).series()
+        except (struct.error, KeyError, IndexError, UnicodeDecodeError, ValueError) as e:
+            raise SnapshotError(f"Snapshot record of {key[0]} is corrupt: {e}")
+
+    def load_into(self, store: ConferenceStore):
+        for key in self._index:
+            store.add_or_merge_series(self.load_series(key))
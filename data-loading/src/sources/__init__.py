@@ -1,4 +1,31 @@
+import importlib
+
+from typing import Dict, Iterable, List, Optional, Type
+
 from .base import DataSource
-from .own import Own
-from .ccfddl import CCFDDL
-from .guofeigu import GuofeiGu
\ No newline at end of file
+
+
+# name -> "module:class", in the order the sources are merged
+# modules are only imported once a source is selected, so a partial refresh
+# does not pay for the dependencies of the other sources
+SOURCES: Dict[str, str] = {
+    "own": ".own:Own",
+    "ccfddl": ".ccfddl:CCFDDL",
+    "guofeigu": ".guofeigu:GuofeiGu",
+}
+# the previous state every refresh is merged into, always selected
+BASE_SOURCES = ["own"]
+
+
+def load_source(name: str) -> Type[DataSource]:
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source {name}, available sources: {', '.join(SOURCES)}")
+    module_name, class_name = SOURCES[name].split(":")
+    module = importlib.import_module(module_name, __name__)
+    return getattr(module, class_name)
+
+
+def load_sources(names: Optional[Iterable[str]] = None) -> List[Type[DataSource]]:
+    # all sources if names is None, otherwise the selected ones plus the base sources
+    selected = set(SOURCES) if names is None else set(names) | set(BASE_SOURCES)
+    return [load_source(name) for name in SOURCES if name in selected]
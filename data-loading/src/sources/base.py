@@ -1,15 +1,36 @@
 from abc import ABC, abstractmethod
+from typing import FrozenSet, Iterable, List, Optional
 
-from ..model import ConferenceStore
+from ..fetch import Fetcher
+from ..model import ConferenceStore, Category
 
 
 class DataSource(ABC):
-    sources = []
+    # payloads requested by initial_load_to and additional_load_to
+    # these are downloaded concurrently before any source starts merging
+    initial_urls: List[str] = []
+    additional_urls: List[str] = []
+    # whether the source only restores the state of a previous build
+    restores_state: bool = False
+    # seconds between refreshes of initial_load_to and additional_load_to in daemon mode
+    # None to only run the phase once when the daemon starts
+    initial_interval: Optional[float] = None
+    additional_interval: Optional[float] = None
 
-    @classmethod
-    def __init_subclass__(cls):
-        super().__init_subclass__()
-        cls.sources.append(cls)
+    def __init__(
+        self,
+        fetcher: Optional[Fetcher] = None,
+        categories: Optional[Iterable[Category]] = None,
+        workers: int = 1,
+    ):
+        self.fetcher = fetcher if fetcher is not None else Fetcher()
+        # categories to refresh, None for all
+        self.categories: Optional[FrozenSet[Category]] = frozenset(categories) if categories is not None else None
+        # processes a source may use for cpu bound work like mapping its entries
+        self.workers = workers
+
+    def selects(self, category: Category) -> bool:
+        return self.categories is None or category in self.categories
     
     @abstractmethod
     def initial_load_to(self, store: ConferenceStore):
@@ -17,4 +38,4 @@ class DataSource(ABC):
 
     @abstractmethod
     def additional_load_to(self, store: ConferenceStore):
-        pass
\ No newline at end of file
+        pass
@@ -1,13 +1,13 @@
-import copy
 import yaml
+import codecs
 import logging
+import multiprocessing
 
-import requests
-
-import daterangeparser
-from dateutil.parser import parse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
 
 from .base import DataSource
+from ..dates import parse_datetime, parse_date_range
 from ..model import (
     Conference, ConferenceSeries, ConferenceStore,
     Event, Category, AcceptanceStatistics
@@ -18,16 +18,67 @@ logger = logging.getLogger(__name__)
 CCFDDL_BASE_URL = "https://ccfddl.com/conference/allconf.yml"
 CCFDDL_ACCEPTANCE_URL = "https://ccfddl.com/conference/allacc.yml"
 
-def strip_invalid_yaml(s):
-    res = ''
-    for x in s:
-        if yaml.reader.Reader.NON_PRINTABLE.match(x):
-            # res += '\\x{:x}'.format(ord(x))
-            continue
-        res += x
-    return res
+# smaller inputs are mapped in process, starting workers would take longer
+MIN_ENTRIES_PER_WORKER = 50
+CHUNKS_PER_WORKER = 4
+
+# libyaml is considerably faster, but is not available on every platform
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_CHUNK_SIZE = 64 * 1024
+
+
+def strip_invalid_yaml(s: str) -> str:
+    # single pass over the text, the pattern matches any character yaml rejects
+    return yaml.reader.Reader.NON_PRINTABLE.sub("", s)
+
+
+# file-like view on a raw payload, decoded and sanitized chunk by chunk
+# while the yaml loader reads it, so no second full copy of the text is built
+class SanitizedYamlStream:
+    def __init__(self, content: bytes, encoding: str, chunk_size: int = YAML_CHUNK_SIZE):
+        self._content = memoryview(content)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._chunk_size = chunk_size
+        self._position = 0
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while (size < 0 or len(self._buffer) < size) and self._position < len(self._content):
+            chunk = self._content[self._position:self._position + self._chunk_size]
+            self._position += len(chunk)
+            text = self._decoder.decode(chunk, final=self._position >= len(self._content))
+            self._buffer += strip_invalid_yaml(text)
+        if size < 0:
+            result, self._buffer = self._buffer, ""
+        else:
+            result, self._buffer = self._buffer[:size], self._buffer[size:]
+        return result
+
+
+def load_yaml(content: bytes, encoding: str):
+    try:
+        return yaml.load(SanitizedYamlStream(content, encoding), Loader=SafeLoader)
+    except yaml.YAMLError:
+        if SafeLoader is yaml.SafeLoader:
+            raise
+        # libyaml is stricter than the pure python loader in a few corner cases
+        logger.warning("Could not load yaml with libyaml, falling back to pure python loader")
+        return yaml.load(SanitizedYamlStream(content, encoding), Loader=yaml.SafeLoader)
+
+def _map_entries(entries: List[dict]) -> List[ConferenceSeries]:
+    # runs in the worker processes of the mapping pool, so it has to be a module-level function
+    source = CCFDDL()
+    store = ConferenceStore()
+    return [source._map_to_series(entry, store) for entry in entries]
+
 
 class CCFDDL(DataSource):
+    initial_urls = [CCFDDL_BASE_URL]
+    additional_urls = [CCFDDL_ACCEPTANCE_URL]
+    # deadlines change often, acceptance statistics once a year
+    initial_interval = 60 * 60
+    additional_interval = 24 * 60 * 60
+
     def _map_category(self, sub: str) -> Category:
         MAPPING = {
             "DS": Category.Architecture,
@@ -46,15 +97,9 @@ class CCFDDL(DataSource):
         return MAPPING[sub]
     
     def _try_get_conference_dates(self, conf):
-        try:
-            return daterangeparser.parse(conf["date"])
-        except:
-            pass
-        try:
-            return parse(conf["date"])
-        except:
-            pass
-        return None
+        if "date" not in conf or type(conf["date"]) is not str:
+            return None
+        return parse_date_range(conf["date"])
 
     def _map_to_conference(self, conf, store: ConferenceStore) -> Conference:
         timeline = []
@@ -68,8 +113,7 @@ class CCFDDL(DataSource):
             timezone = timezone.replace("UTC", "")
             if timezone.lower() == "aoe":
                 timezone = "-12"
-                date = parse(event["deadline"] + f"{timezone}")
-            date = parse(event["deadline"] + f"{timezone}")
+            date = parse_datetime(event["deadline"], timezone)
             
             timeline.append(Event(
                 date=date,
@@ -116,74 +160,81 @@ class CCFDDL(DataSource):
         )
 
     def initial_load_to(self, store: ConferenceStore):
-        r = requests.get(CCFDDL_BASE_URL)
+        r = self.fetcher.get(CCFDDL_BASE_URL)
         if r.status_code != 200:
             logger.error(f"Could not load {CCFDDL_BASE_URL}, status {r.status_code}")
             return
         # is encoded as utf8 but response does not indicate that
-        r.encoding = r.apparent_encoding
-        data = yaml.safe_load(strip_invalid_yaml(r.text))
-
-        for entry in data:
-            series = self._map_to_series(entry, store)
-            store.add_or_merge_series(series)
+        data = load_yaml(r.content, "utf8")
+
+        if self.categories is not None:
+            data = [entry for entry in data if self.selects(self._map_category(entry["sub"]))]
+        # merged in the original order, so the store does not depend on the number of workers
+        # entries of the payload are combined first, so duplicate entries still merge their timelines
+        contribution = ConferenceStore()
+        for series in self._map_all(data, store):
+            contribution.add_or_merge_series(series)
+        store.counters.conflicts += contribution.counters.conflicts
+        store.counters.statistics_mismatches += contribution.counters.statistics_mismatches
+        # the payload holds the complete timeline of every conference it lists,
+        # so restored events that are no longer listed (e.g. moved deadlines) are dropped
+        for series in contribution.series.values():
+            store.add_or_merge_series(series, replace_timelines=True)
+
+    def _map_all(self, entries: List[dict], store: ConferenceStore) -> List[ConferenceSeries]:
+        # date parsing makes mapping cpu bound, so larger inputs are split across processes
+        if self.workers <= 1 or len(entries) < MIN_ENTRIES_PER_WORKER * 2:
+            return [self._map_to_series(entry, store) for entry in entries]
+        workers = min(self.workers, len(entries) // MIN_ENTRIES_PER_WORKER)
+        # a few chunks per worker balance uneven entries without much pickling overhead
+        chunk_size = -(-len(entries) // (workers * CHUNKS_PER_WORKER))
+        chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+        # spawn, forking is not safe while the daemon or query server run other threads
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            return [series for mapped in executor.map(_map_entries, chunks) for series in mapped]
 
     def _process_acceptance_entry(self, entry, store: ConferenceStore):
-        # inconsistency in CCFDDL data
-        name = entry["title"]
-        if name == "UbiComp":
-            name = "UbiComp/ISWC"
-        name = store.normalize_series_name(name)
+        # names that differ from the conference data (e.g. UbiComp) are resolved through aliases.yml
+        name = store.normalize_series_name(entry["title"])
 
         # ccfddl only supplies the name of the conference
         # this does not uniquely identify the conference, as there can be
         # multiple conferences with the same (short) name but different category
         # e.g. FSE (Cryptography or Software Engineering)
-        candidates = store.find_series(name=name)
+        candidates = store.resolve_series(name)
         if len(candidates) == 0:
             # as the ccfddl data is loaded beforehand, this only happens
             # when there are inconsistent names between the acceptance and
             # conference data
             logger.warning(f"No matching conference found for {name}")
+            store.counters.skipped += 1
+            return
+        # candidates are sorted by heuristic, best match first
+        series = candidates[0]
+        if not self.selects(series.category):
             return
-        if len(candidates) > 1:
-            # sort by heuristic
-            # better conference would be more important
-            # higher rank or higher number of years in case of tie
-            CORE_RANKING = {
-                "A*": 4,
-                "A": 3,
-                "B": 2,
-                "C": 1,
-                "N": 0,
-            }
-            candidates.sort(
-                key=lambda c: (0 if "core" not in c.rankings else CORE_RANKING[c.rankings["core"]], len(c.conferences)),
-                reverse=True, # descending, higher values first
-            )
-        series = copy.deepcopy(candidates[0])
         
+        acceptance_statistics = {}
         for accept_entry in entry["accept_rates"]:
             year = int(accept_entry["year"])
             if year not in series.conferences:
                 # cannot add statistics for which we have no conference data
                 continue
-            series.acceptance_statistics[year] = AcceptanceStatistics(
+            acceptance_statistics[year] = AcceptanceStatistics(
                 accepted=int(accept_entry["accepted"]),
                 submitted=int(accept_entry["submitted"])
             )
         
-        store.add_or_merge_series(series)
+        store.enrich_series(series.name, series.category, acceptance_statistics=acceptance_statistics)
         
 
     def additional_load_to(self, store):
-        r = requests.get(CCFDDL_ACCEPTANCE_URL)
+        r = self.fetcher.get(CCFDDL_ACCEPTANCE_URL)
         if r.status_code != 200:
             logger.error(f"Could not load {CCFDDL_ACCEPTANCE_URL}, status {r.status_code}")
             return
         # is encoded as utf8 but response does not indicate that
-        r.encoding = r.apparent_encoding
-        data = yaml.safe_load(strip_invalid_yaml(r.text))
+        data = load_yaml(r.content, "utf8")
 
         for entry in data:
             self._process_acceptance_entry(entry, store)        
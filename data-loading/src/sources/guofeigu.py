@@ -1,63 +1,69 @@
 import re
-import copy
 import logging
 
-import requests
-from bs4 import BeautifulSoup
+from typing import Dict, Iterator, Tuple
 
 from .base import DataSource
-from ..model import AcceptanceStatistics, Category
+from .html_tables import iter_table_rows
+from ..model import AcceptanceStatistics, Category, normalize_series_name
 
 logger = logging.getLogger(__name__)
 URL = "https://people.engr.tamu.edu/guofei/sec_conf_stat.htm"
+# hard code second table as correct one
+STATISTICS_TABLE = 1
+STATISTICS_PATTERN = re.compile(r"\d+[.]\d\%[ ]?\((\d+)\/(\d+)")
+
+
+def iter_statistics(html: str) -> Iterator[Tuple[str, int, AcceptanceStatistics]]:
+    # yields (series name, year, statistics) for every cell with statistics
+    # first row is a title, second row names the conferences, then one row per year
+    names = []
+    for i, row in enumerate(iter_table_rows(html, STATISTICS_TABLE)):
+        if i == 0:
+            continue
+        if i == 1:
+            names = [normalize_series_name(cell.links[0] if cell.links else cell.text) for cell in row]
+            continue
+        try:
+            year = int(row[0].text)
+        except (IndexError, ValueError):
+            logger.warning(f"Could not parse year of row {i} in statistics table")
+            continue
+        # first column holds the year, so names are offset by one
+        for name, cell in zip(names, row[1:]):
+            match = STATISTICS_PATTERN.search(cell.text)
+            if match is None:
+                continue
+            yield name, year, AcceptanceStatistics(
+                submitted=int(match.group(2)),
+                accepted=int(match.group(1)),
+            )
+
 
 class GuofeiGu(DataSource):
+    additional_urls = [URL]
+    additional_interval = 24 * 60 * 60
+
     def initial_load_to(self, store):
         pass # no standalone data
 
     def additional_load_to(self, store):
-        r = requests.get(URL)
+        if not self.selects(Category.Security):
+            return
+        r = self.fetcher.get(URL)
         if r.status_code != 200:
             logger.error(f"Could not load {URL}, status {r.status_code}")
             return
-        soup = BeautifulSoup(r.text, features="html.parser")
-        tables = soup.find_all("table")
-        # hard code second table as correct one
-        table = tables[1].find("tbody")
-        
-        column_names = {}
-        statistics_pattern = r"\d+[.]\d\%[ ]?\((\d+)\/(\d+)"
-        all_acceptances = {}
-        for i, row in enumerate(table.find_all("tr")):
-            if i == 0:
-                continue
-            if i == 1:
-                for j, col in enumerate(row.find_all("td")):
-                    text = col.find("a").text
-                    name = store.normalize_series_name(text)
-                    column_names[j+1] = name
-                    all_acceptances[j+1] = []
-                continue
-            children = row.find_all("td")
-            year = int(children[0].text)
-            for j in range(1, len(children)):
-                match = re.search(statistics_pattern, children[j].text)
-                if match is None:
-                    continue
-
-                submitted = int(match.group(2))
-                accepted = int(match.group(1))
-                all_acceptances[j].append((year, AcceptanceStatistics(
-                    submitted=submitted,
-                    accepted=accepted,
-                )))
-        
-        for j, name in column_names.items():
-            series = store.find_series(name, Category.Security)
+
+        all_acceptances: Dict[str, Dict[int, AcceptanceStatistics]] = {}
+        for name, year, statistics in iter_statistics(r.text):
+            # later rows win for duplicate years
+            all_acceptances.setdefault(name, {})[year] = statistics
+
+        for name, acceptance_statistics in all_acceptances.items():
+            series = store.resolve_series(name, Category.Security)
             if len(series) != 1:
+                logger.warning(f"No matching series found for column {name}")
+                store.counters.skipped += 1
                 continue # series does not exist in our data
-            series = copy.deepcopy(series[0])
-            
-            for year, statistic in all_acceptances[j]:
-                series.acceptance_statistics[year] = statistic
-            store.add_or_merge_series(series)
\ No newline at end of file
+            store.enrich_series(series[0].name, Category.Security, acceptance_statistics=acceptance_statistics)
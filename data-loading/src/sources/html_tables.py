@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Iterator, List, Optional
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+
+# streaming extraction of a single table from an html page
+# the page is parsed in chunks and parsing stops as soon as the table is closed,
+# so no tree of the whole page is ever built. lxml is used if it is installed
+HTML_CHUNK_SIZE = 1 << 14
+
+
+@dataclass(slots=True)
+class TableCell:
+    # all text in the cell, including nested elements
+    text: str
+    # text of every link in the cell, in document order
+    links: List[str] = field(default_factory=list)
+
+
+class _TableParser(HTMLParser):
+    # tables are counted in document order including nested ones, like find_all("table")
+    # only the td cells of rows directly in the target table are collected
+    def __init__(self, table_index: int):
+        super().__init__(convert_charrefs=True)
+        self.table_index = table_index
+        self.tables = 0
+        # nesting depth of tables inside the target table, 0 outside of it
+        self.depth = 0
+        self.done = False
+        self.rows: List[List[TableCell]] = []
+        self._row: Optional[List[TableCell]] = None
+        self._cell: Optional[List[str]] = None
+        self._links: List[str] = []
+        self._link: Optional[List[str]] = None
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._close_link()
+            self._row.append(TableCell("".join(self._cell), self._links))
+            self._cell = None
+            self._links = []
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def _close_link(self):
+        if self._link is not None:
+            self._links.append("".join(self._link))
+            self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self.depth > 0:
+                self.depth += 1
+            elif self.tables == self.table_index:
+                self.depth = 1
+            self.tables += 1
+            return
+        if self.depth == 0:
+            return
+        if tag == "a" and self._cell is not None:
+            self._close_link()
+            self._link = []
+        if self.depth > 1:
+            return
+        # cells and rows may be closed implicitly by the next one
+        if tag == "tr":
+            self._close_row()
+            self._row = []
+        elif tag == "td":
+            self._close_cell()
+            if self._row is None:
+                self._row = []
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if self.depth == 0:
+            return
+        if tag == "a":
+            self._close_link()
+        elif tag == "table":
+            self.depth -= 1
+            if self.depth == 0:
+                self._close_row()
+                self.done = True
+        elif self.depth == 1 and tag == "td":
+            self._close_cell()
+        elif self.depth == 1 and tag == "tr":
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+            if self._link is not None:
+                self._link.append(data)
+
+
+def _chunks(html: str, chunk_size: int) -> Iterator[str]:
+    for start in range(0, len(html), chunk_size):
+        yield html[start:start + chunk_size]
+
+
+def _iter_rows_stdlib(html: str, table_index: int, chunk_size: int) -> Iterator[List[TableCell]]:
+    parser = _TableParser(table_index)
+    for chunk in _chunks(html, chunk_size):
+        parser.feed(chunk)
+        yield from parser.rows
+        parser.rows = []
+        if parser.done:
+            return
+    parser.close()
+    # unterminated table at the end of the page
+    parser._close_row()
+    yield from parser.rows
+
+
+def _text(element) -> str:
+    return "".join(element.itertext())
+
+
+def _iter_events(parser, html: str, chunk_size: int):
+    for chunk in _chunks(html, chunk_size):
+        parser.feed(chunk)
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def _iter_rows_lxml(html: str, table_index: int, chunk_size: int) -> Iterator[List[TableCell]]:
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    tables = 0
+    target = None
+    for event, element in _iter_events(parser, html, chunk_size):
+        if element.tag == "table" and event == "start":
+            if tables == table_index:
+                target = element
+            tables += 1
+        elif target is None or event != "end":
+            continue
+        elif element is target:
+            return
+        elif element.tag == "tr" and next(element.iterancestors("table"), None) is target:
+            yield [
+                TableCell(_text(cell), [_text(link) for link in cell.iter("a")])
+                for cell in element.iterchildren("td")
+            ]
+            # rows are not needed anymore once extracted
+            element.clear(keep_tail=True)
+
+
+def iter_table_rows(html: str, table_index: int, chunk_size: int = HTML_CHUNK_SIZE) -> Iterator[List[TableCell]]:
+    # yields the td cells of every row of the table_index-th table (0-based) of the page
+    if etree is not None:
+        return _iter_rows_lxml(html, table_index, chunk_size)
+    return _iter_rows_stdlib(html, table_index, chunk_size)
@@ -4,9 +4,8 @@ import logging
 
 from typing import Optional
 
-from dateutil.parser import parse
-
 from .base import DataSource
+from ..dates import parse_datetime
 from ..model import (
     Conference, ConferenceSeries, ConferenceStore,
     Event, Category, AcceptanceStatistics
@@ -15,6 +14,9 @@ from ..model import (
 logger = logging.getLogger(__name__)
 
 class Own(DataSource):
+    # restores the previously published state, not needed when a snapshot is available
+    restores_state = True
+
     def _try_parse_series(self, entry) -> Optional[ConferenceSeries]:
         if "name" not in entry:
             logger.warning("No name found in series entry")
@@ -102,7 +104,7 @@ class Own(DataSource):
             logger.warning("No timeline found in conference entry")
             return None
         timeline = []
-        for event in timeline:
+        for event in entry["timeline"]:
             event = self._try_parse_event(event)
             if event is None:
                 logger.warning("Could not parse event found in conference entry")
@@ -122,7 +124,15 @@ class Own(DataSource):
         if "date" not in entry:
             logger.warning("No date found in conference entry")
             return None
-        date = parse(entry["date"])
+        if entry["date"] is None:
+            # conference end can be unknown
+            date = None
+        else:
+            try:
+                date = parse_datetime(str(entry["date"]))
+            except (ValueError, OverflowError):
+                logger.warning("Could not parse date found in conference entry")
+                return None
         return Event(
             date=date,
             description=description,
@@ -139,6 +149,7 @@ class Own(DataSource):
             # ignore keys, as all information can be restored from the values alone
             series = self._try_parse_series(value)
             if series is None:
+                store.counters.skipped += 1
                 continue
             store.add_or_merge_series(series)
 
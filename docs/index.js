@@ -4,6 +4,17 @@ var SETTINGS = {
 };
 
 async function loadData() {
+    // the pointer names the current content-hashed data file, which never changes and can be cached
+    try {
+        const pointer = await fetch("data/conferences.latest.json", { cache: "no-cache" });
+        if (pointer.ok) {
+            const latest = await pointer.json();
+            const response = await fetch("data/" + latest.path);
+            if (response.ok) return await response.json();
+        }
+    } catch (e) {
+        console.warn("Could not load published data, falling back to conferences.json", e);
+    }
     const response = await fetch("data/conferences.json");
     return await response.json();
 }